@@ -0,0 +1,493 @@
+"""The "Understanding Algebra Notation" lesson.
+
+Registered as the built-in "algebra-notation" lesson in lessons.py; the
+MathCraft app imports this module the first time a student opens it and
+calls render() on every rerun.
+"""
+import base64
+import os
+import secrets
+
+import streamlit as st
+
+import atlas
+import export
+import instrumentation
+import shared_cache
+from figures import DEFAULT_ENCODING, ENCODINGS, FIGURE_BUILDERS, render_image
+from grading import BANK, QUESTION_IDS, typed_answers
+from item_generator import generate_items, worksheet
+from notation import MAX_LENGTH
+from pizza_cutter import pizza_cutter
+from reflections import ReflectionIndex
+from session_record import ANALYTICAL_KEYS, SessionRecord
+from submissions import DEFAULT_URL, SubmissionBacklog, WriteBehindStore, make_submission, open_store
+from svg_figures import SVG_BUILDERS, render_svg
+
+TITLE = "Understanding Algebra Notation"
+ICON = "🧮"
+
+# Optional warm-up: render every variant of the figures the atlas can serve
+# (see atlas_figures) once per process at boot.
+# Set MATHCRAFT_ATLAS to a directory (reused if current) or to "memory".
+@st.cache_resource(show_spinner="Preparing lesson visuals...")
+def warm_figure_atlas(setting, figure_ids):
+    return atlas.warm_up(None if setting == "memory" else setting, figure_ids=figure_ids)
+
+# Optional render cache shared by every worker process on this machine.
+# Set MATHCRAFT_SHARED_CACHE to a file, ideally on tmpfs (/dev/shm/mathcraft-figures).
+@st.cache_resource
+def shared_render_cache(path):
+    size_mb = int(os.environ.get("MATHCRAFT_SHARED_CACHE_MB", shared_cache.DEFAULT_SIZE_MB))
+    return shared_cache.install(path, size_mb)
+
+# One submission store shared by every session in this process, written
+# from a background thread so submitting never waits on the disk.
+# Point MATHCRAFT_SUBMISSIONS at e.g. "sqlite:////srv/mathcraft/submissions.db".
+@st.cache_resource
+def submission_store():
+    return WriteBehindStore(open_store(os.environ.get("MATHCRAFT_SUBMISSIONS", DEFAULT_URL)))
+
+# How often the submit section checks whether a queued submission is saved
+SAVE_POLL_SECONDS = 0.5
+
+# Generated practice items, shared by every session in this process.
+# Each session draws its own worksheet from the pool by seed.
+ITEM_POOL_SIZE = 4096
+ITEM_POOL_SEED = 2025
+
+@st.cache_resource
+def practice_item_pool():
+    return generate_items(ITEM_POOL_SIZE, seed=ITEM_POOL_SEED)
+
+# How many submissions the dashboard table shows
+RECENT_SUBMISSIONS = 200
+
+# The reflections index, kept up to date with the store by each dashboard rerun
+@st.cache_resource
+def reflection_index():
+    return ReflectionIndex()
+
+# Renderer per figure: "svg" or one of the raster encodings in figures.py
+# ("png", "png8", "webp"). The grouping diagrams default to inline SVG, the
+# rest to cached palette PNGs. Override with e.g. MATHCRAFT_RENDERERS="fig1=png8,fig4=webp".
+FIGURE_RENDERERS = {"fig1": "svg", "fig2": "svg", "fig4": "png8"}
+FIGURE_RENDERERS.update(
+    (figure_id.strip(), renderer.strip())
+    for figure_id, _, renderer in (
+        item.partition("=") for item in os.environ.get("MATHCRAFT_RENDERERS", "").split(",") if "=" in item
+    )
+)
+
+def show_figure(figure_id, *params):
+    renderer = FIGURE_RENDERERS.get(figure_id)
+    with instrumentation.timed_section(figure_id):
+        if renderer == "svg" and figure_id in SVG_BUILDERS:
+            st.image(render_svg(figure_id, *params), width="stretch")
+        elif renderer == "webp":
+            # st.image would convert WebP bytes to JPEG, so pass a data URL instead
+            data = base64.b64encode(render_image(figure_id, *params, encoding="webp")).decode()
+            st.image(f"data:image/webp;base64,{data}", width="stretch")
+        else:
+            encoding = renderer if renderer in ENCODINGS else DEFAULT_ENCODING
+            # output_format="PNG" keeps Streamlit from re-encoding the bytes
+            st.image(render_image(figure_id, *params, encoding=encoding), width="stretch", output_format="PNG")
+
+def atlas_figures():
+    """The figures show_figure draws in the atlas's encoding; SVG and WebP
+    figures never read it, so rendering them at boot would be wasted."""
+    def encoding(figure_id):
+        renderer = FIGURE_RENDERERS.get(figure_id)
+        if renderer == "svg" and figure_id in SVG_BUILDERS:
+            return "svg"
+        return renderer if renderer in ENCODINGS else DEFAULT_ENCODING
+    return tuple(figure_id for figure_id in FIGURE_BUILDERS if encoding(figure_id) == DEFAULT_ENCODING)
+
+def typed_key(question):
+    return f"{question.key}_typed"
+
+def practice_questions(questions, key_prefix=""):
+    """`questions` as selectboxes in two columns, or as text boxes for the
+    free-response questions when the student has chosen to type answers.
+
+    Each selectbox holds the chosen option's index, not its text.
+    """
+    typing = st.session_state.get("free_response", False)
+    columns = st.columns(2)
+    for question in questions:
+        with columns[question.column]:
+            if typing and question.free_response:
+                st.text_input(question.prompt, key=key_prefix + typed_key(question), placeholder="e.g. 24 or 4 · 6",
+                              max_chars=MAX_LENGTH)
+            else:
+                st.selectbox(question.prompt, range(len(question.options)),
+                             format_func=question.options.__getitem__, key=key_prefix + question.key)
+
+def given_answers(questions, key_prefix=""):
+    """Each question's answer as the student gave it: the typed text for
+    free-response questions in typing mode, otherwise the option index."""
+    typing = st.session_state.get("free_response", False)
+    return [st.session_state.get(key_prefix + typed_key(question), "") if typing and question.free_response
+            else st.session_state.get(key_prefix + question.key) for question in questions]
+
+# Each section below is a fragment: moving a slider or answering a question
+# reruns only that section, not the whole lesson.
+
+# Section 1: Multiplication Without the · Symbol
+@st.fragment
+@instrumentation.timed("multiplication")
+def section_multiplication():
+    st.markdown("---")
+    st.markdown("### ✖️ Section 1: Multiplication Without the · Symbol")
+    st.markdown("**The Big Idea:** In algebra, we often skip writing the multiplication symbol!")
+
+    # Interactive multiplication examples
+    st.markdown("#### 🎯 Interactive Examples")
+    multiplier = st.slider("Choose a number for the examples:", 1, 10, 3, key="mult_slider")
+
+    show_figure("fig1", multiplier)
+
+    # Practice questions for multiplication
+    st.markdown("#### 🎮 Practice: What do these mean?")
+    practice_questions(BANK.group("multiplication"))
+
+
+# Section 2: Division with Fractions - NOW WITH FIXED INTERACTIVE PIZZA CUTTER!
+@st.fragment
+@instrumentation.timed("division")
+def section_division():
+    st.markdown("---")
+    st.markdown("### ➗ Section 2: Division Using Fraction Notation")
+    st.markdown("**The Big Idea:** n/8 means n divided by 8, just like a fraction!")
+
+    # Interactive division examples
+    divisor = st.slider("Choose a divisor for examples:", 2, 10, 8, key="div_slider")
+
+    # COMPLETELY REDESIGNED Division Visualization
+    st.markdown("#### 🎯 Visual Examples: What n/8 Really Means")
+
+    show_figure("fig2", divisor)
+
+    # COMPLETELY FIXED INTERACTIVE PIZZA CUTTER - INSTANT UPDATES, REALISTIC PEPPERONI!
+    st.markdown("#### 🍕 Interactive Pizza Division with Real Pizza Cutter!")
+    st.markdown("**Try the interactive pizza cutter below to see division in action:**")
+
+    # The COMPLETELY FIXED interactive pizza cutter, served as a static component
+    with instrumentation.timed_section("pizza_cutter"):
+        pizza_cutter(divisor)
+
+    st.markdown("#### 🎮 Practice: What do these mean?")
+    practice_questions(BANK.group("division"))
+
+
+# Section 3: Combined Operations
+@st.fragment
+@instrumentation.timed("combined")
+def section_combined():
+    st.markdown("---")
+    st.markdown("### 🔄 Section 3: Combining Operations")
+    st.markdown("**The Big Idea:** We can combine multiplication and division in algebra notation!")
+
+    # Interactive combined examples
+    st.markdown("#### 🎯 Complex Examples")
+    coeff = st.slider("Choose a coefficient:", 2, 6, 3, key="coeff_slider")
+    divisor2 = st.slider("Choose a divisor:", 2, 8, 4, key="div2_slider")
+
+    show_figure("fig4", coeff, divisor2)
+
+    # Final practice
+    st.markdown("#### 🎮 Challenge Practice")
+    practice_questions(BANK.group("challenge"))
+
+
+# Fresh practice drawn from the generated pool; not part of the Q1-Q12 score
+@st.fragment
+@instrumentation.timed("fresh_practice")
+def section_fresh_practice():
+    st.markdown("#### 🎲 Fresh Practice")
+    st.markdown("*A new set of problems just for you. These don't count toward your score.*")
+    new_problems = st.button("🔄 New Problems", key="new_worksheet")
+    if new_problems or "worksheet_seed" not in st.session_state:
+        st.session_state.worksheet_seed = secrets.randbits(32)
+    items = worksheet(practice_item_pool(), st.session_state.worksheet_seed)
+    fresh_questions = [items.question(i, f"F{i + 1}") for i in range(len(items))]
+    key_prefix = f"{st.session_state.worksheet_seed}_"
+    practice_questions(fresh_questions, key_prefix=key_prefix)
+    if st.button("🔍 Check Fresh Practice", key="check_fresh"):
+        fresh_score = sum(
+            q.encode([answer])[0] == q.answer for q, answer in zip(fresh_questions, given_answers(fresh_questions, key_prefix))
+        )
+        st.info(f"Fresh Practice: {fresh_score}/{len(fresh_questions)} correct")
+
+
+# Analytical Thinking Questions
+@st.fragment
+@instrumentation.timed("analytical")
+def section_analytical():
+    st.markdown("---")
+    st.markdown("### 🧠 Analytical Thinking: Why Does This Work?")
+    st.markdown("*Think deeply about these concepts:*")
+
+    for question in BANK.analytical:
+        st.text_area(question.prompt, height=100, key=question.key, placeholder=question.placeholder)
+
+
+# Answer key and feedback
+@st.fragment
+@instrumentation.timed("grading")
+def section_grading():
+    st.markdown("---")
+    st.markdown("### ✅ Check Your Understanding")
+
+    record = st.session_state.record
+    record.set_answers(given_answers(BANK.questions))
+    score = record.score()
+
+    if st.button("🎯 Check My Answers", type="primary"):
+        st.markdown(f"### 📊 Your Score: {score}/12 ({(score/12)*100:.0f}%)")
+
+        if score == 12:
+            st.success("🌟 Perfect! You've mastered algebra notation!")
+        elif score >= 10:
+            st.success("🎯 Excellent work! You understand the concepts very well!")
+        elif score >= 8:
+            st.info("👍 Good job! Review the concepts you missed and try again!")
+        else:
+            st.warning("📚 Keep practicing! Focus on the visual examples above.")
+
+
+# Submit section
+@st.fragment
+@instrumentation.timed("submit")
+def section_submit():
+    st.markdown("---")
+    if st.button("✅ Submit My Work", type="primary"):
+        # Read at click time: a fragment rerun doesn't refresh the page-level variables
+        record = st.session_state.record
+        answers = given_answers(BANK.questions)
+        record.set_answers(answers)
+        if record.complete:
+            # The analytical answers go straight from their text areas to the store
+            analytical = [st.session_state[key] for key in ANALYTICAL_KEYS]
+            typed = {q.id: answer for q, answer in zip(BANK.questions, answers) if isinstance(answer, str)}
+            submission = make_submission(record.responses(analytical, typed), record.class_name)
+            try:
+                receipt = submission_store().add(submission)
+            except SubmissionBacklog:
+                st.error("So many students are submitting right now that your work couldn't be queued. "
+                         "Please click Submit again in a moment.")
+                return
+            record.submissions += 1
+            score = record.score()
+            st.session_state.last_submission = (
+                receipt, f"Great work {record.name}! Your score: {score}/12 ({(score/12)*100:.0f}%)")
+        else:
+            st.error("Please enter your name and date before submitting!")
+    if "last_submission" in st.session_state:
+        submission_status()
+
+
+def submission_status():
+    """The score from the last submission, and whether the store has it yet."""
+    receipt, message = st.session_state.last_submission
+    st.success(message)
+    if not receipt.done():
+        saving_status()
+    elif receipt.exception() is not None:
+        st.error("Your work couldn't be saved. Please click Submit again.")
+    else:
+        st.caption("💾 Saved")
+
+
+# Polls only while the submission is queued, then reruns the page to stop polling
+@st.fragment(run_every=SAVE_POLL_SECONDS)
+def saving_status():
+    receipt, _ = st.session_state.last_submission
+    if receipt.done():
+        st.rerun()
+    st.caption("⏳ Saving your work...")
+
+
+def reflections_panel(store, filters):
+    """Concepts and groups of similar answers in the analytical reflections."""
+    import pandas as pd
+
+    index = reflection_index()
+    index.update(store)
+    prompts = {question.id: question.prompt.split(":")[0].strip("0123456789. *") for question in BANK.analytical}
+    question_id = st.selectbox("Question:", list(prompts), format_func=prompts.get, key="reflection_question")
+    report = index.report(question_id, **filters)
+    if not report.answers:
+        st.info("No reflections on this question yet.")
+        return
+
+    st.markdown(f"**Key concepts mentioned** ({report.answers} answers)")
+    st.bar_chart(pd.Series(report.concepts, name="Answers"), sort=False, horizontal=True)
+    st.markdown("**Similar answers**")
+    for cluster in report.clusters:
+        with st.expander(f"{', '.join(cluster.terms)} ({cluster.size} answers)"):
+            for name, answer in cluster.examples:
+                st.markdown(f"**{name}:** {answer}")
+    st.dataframe(pd.DataFrame(report.flagged, columns=["Name", "Class", "Answer", "Concepts"]),
+                 hide_index=True, width="stretch")
+
+
+# Teacher access (password protected)
+@st.fragment
+@instrumentation.timed("teacher_dashboard")
+def section_teacher_dashboard():
+    st.markdown("---")
+    teacher_password = st.text_input("🏫 Teacher Access Code:", type="password", key="teacher_pass")
+
+    if teacher_password == "algebra2025":
+        # Only the dashboard needs pandas, so students never pay for importing it
+        import pandas as pd
+
+        st.markdown("### 📊 Teacher Dashboard")
+        store = submission_store()
+        filter_col1, filter_col2 = st.columns(2)
+        with filter_col1:
+            class_filter = st.selectbox("Class/Period:", ["All classes"] + store.classes(), key="dashboard_class")
+        with filter_col2:
+            date_filter = st.date_input("Submitted on:", value=None, key="dashboard_date")
+        filters = {
+            "class_name": None if class_filter == "All classes" else class_filter,
+            "submitted_on": date_filter.isoformat() if date_filter else None,
+        }
+        # Running totals kept by the store, so this doesn't grow with submissions
+        totals = store.aggregate(**filters)
+        if totals.count:
+            avg_score = totals.class_average
+            metric_col1, metric_col2 = st.columns(2)
+            metric_col1.metric("Class Average", f"{avg_score:.1f}/12 ({(avg_score/12)*100:.0f}%)")
+            metric_col2.metric("Submissions", totals.count)
+            st.markdown("**Percent correct by question**")
+            st.bar_chart(pd.Series(totals.difficulty * 100, index=QUESTION_IDS, name="% correct"), sort=False)
+            st.markdown("**Score distribution**")
+            st.bar_chart(pd.Series(totals.histogram, name="Students"), sort=False)
+
+            responses_tab, reflections_tab = st.tabs(["📋 Responses", "💭 Reflections"])
+            with responses_tab:
+                # Only the most recent submissions are loaded for the table
+                df = pd.DataFrame(store.query(**filters, limit=RECENT_SUBMISSIONS))
+                st.caption(f"Showing the {len(df)} most recent of {totals.count} submissions")
+                st.dataframe(df, width="stretch")
+
+                # Every distinct typed answer, graded in one batch per question
+                typed = typed_answers(df)
+                if typed:
+                    st.markdown("**Typed answers**")
+                    st.dataframe(pd.DataFrame(typed, columns=["Question", "Answer", "Students", "Correct"]),
+                                 hide_index=True, width="stretch")
+
+                # Download option: the file is only built, chunk by chunk, on click
+                export_format = st.radio("Format:", list(export.FORMATS), horizontal=True, key="export_format")
+                extension, mime = export.FORMATS[export_format]
+                st.download_button(
+                    label="📥 Download Class Data",
+                    data=lambda: export.export_bytes(store, export_format, **filters),
+                    file_name=f"algebra_notation_responses.{extension}",
+                    mime=mime,
+                    on_click="ignore"
+                )
+            with reflections_tab:
+                reflections_panel(store, filters)
+        else:
+            st.info("No student responses yet.")
+    elif teacher_password and teacher_password != "algebra2025":
+        st.error("❌ Incorrect access code")
+
+
+def render():
+    if os.environ.get("MATHCRAFT_ATLAS") and atlas_figures():
+        warm_figure_atlas(os.environ["MATHCRAFT_ATLAS"], atlas_figures())
+    if os.environ.get("MATHCRAFT_SHARED_CACHE"):
+        shared_render_cache(os.environ["MATHCRAFT_SHARED_CACHE"])
+
+    # Header with logo-style branding
+    st.markdown("""
+    <div style="text-align: center; padding: 1rem; background: linear-gradient(90deg, #667eea 0%, #764ba2 100%); border-radius: 10px; margin-bottom: 2rem;">
+        <h2 style="color: white; margin: 0; font-weight: bold;">🧮 MathCraft</h2>
+        <p style="color: #f0f0f0; margin: 0; font-style: italic;">Hands-On Mathematical Thinking</p>
+        <p style="color: #e0e0e0; margin: 0; font-size: 0.8rem; margin-top: 0.5rem;">© All Rights Reserved - Xavier Honablue M.Ed</p>
+    </div>
+    """, unsafe_allow_html=True)
+
+    st.markdown("<h1 style='text-align: center; color: #4f46e5;'>🔤 Understanding Algebra Notation</h1>", unsafe_allow_html=True)
+
+    # Initialize session state
+    if "record" not in st.session_state:
+        st.session_state.record = SessionRecord()
+
+    # Michigan Learning Standards
+    st.markdown("---")
+    st.markdown("### 📚 Michigan Learning Standards Addressed")
+    with st.expander("Click to view aligned standards"):
+        st.markdown("""
+        **6.EE.2** - Write, read, and evaluate expressions in which letters stand for numbers.
+        *Applied through: Reading algebraic notation like 3x and n/8, translating between algebraic and arithmetic expressions*
+
+        **6.EE.6** - Use variables to represent numbers and write expressions when solving real-world problems.
+        *Applied through: Using variables in multiplication and division contexts, connecting to real situations*
+
+        **5.OA.2** - Write simple expressions and interpret patterns in expressions.
+        *Applied through: Recognizing patterns in algebraic notation, understanding structure of expressions*
+
+        **Mathematical Practices:**
+        - **MP.1** - Make sense of problems and persevere in solving them
+        - **MP.2** - Reason abstractly and quantitatively *(translating between notation systems)*
+        - **MP.3** - Construct viable arguments *(explaining why 3x means 3 · x)*
+        - **MP.6** - Attend to precision *(using correct mathematical notation)*
+        - **MP.7** - Look for structure *(recognizing patterns in algebraic expressions)*
+        """)
+
+    st.markdown("---")
+    st.markdown("### 👨‍🎓 Student Information")
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        name = st.text_input("Name:", key="student_name")
+    with col2:
+        class_name = st.text_input("Class/Period:", key="student_class")
+    with col3:
+        date = st.text_input("Date:", key="student_date")
+
+    st.session_state.record.set_student(name, date, class_name)
+
+    # Learning Objective
+    st.markdown("---")
+    st.markdown("""
+    ### 🧠 Learning Objective
+    Learn to read and understand basic algebra notation by connecting symbols to their meanings through visual representations.
+
+    **Key Concept:** Algebra notation is just a shorter way to write math operations we already know!
+    """)
+
+    st.toggle("⌨️ Type my answers instead of choosing them", key="free_response",
+              help="For questions that ask for a value, write it like 24 or 4 · 6. "
+                   "Any expression with the same value counts!")
+
+    section_multiplication()
+    section_division()
+    section_combined()
+    section_fresh_practice()
+    section_analytical()
+    section_grading()
+
+    # Summary section
+    st.markdown("---")
+    st.markdown("### 📝 Key Takeaways")
+    st.markdown("""
+    **Remember these patterns:**
+
+    1. **3x** means **3 · x** (multiplication without the · symbol)
+    2. **n/8** means **n ÷ 8** (division using fraction notation)  
+    3. **5y/4** means **(5 · y) ÷ 4** (multiply first, then divide)
+
+    **The secret:** Algebra notation is just shorthand for operations you already know!
+    """)
+
+    section_submit()
+    section_teacher_dashboard()
+
+    st.markdown("---")
+    st.markdown("*Keep practicing! Algebra notation gets easier with repetition! 🌟*")
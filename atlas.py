@@ -0,0 +1,167 @@
+"""Precomputed atlas of every lesson figure variant.
+
+The slider domains are small and fixed, so every figure can be rendered once
+at boot (or ahead of time into a directory) and served without matplotlib.
+
+    python atlas.py build ATLAS_DIR [--processes N]
+    python atlas.py check ATLAS_DIR [--deep]
+"""
+import argparse
+import hashlib
+import importlib.metadata
+import json
+import multiprocessing
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import figures
+import notation
+
+MANIFEST = "manifest.json"
+
+
+class AtlasError(Exception):
+    """Raised when an atlas directory is missing, incomplete or stale."""
+
+
+def fingerprint():
+    """Hash of everything that determines the rendered bytes."""
+    digest = hashlib.sha256()
+    for module in (figures, notation):
+        with open(module.__file__, "rb") as source:
+            digest.update(source.read())
+    # From package metadata, so checking an atlas doesn't import matplotlib
+    for package in ("matplotlib", "pillow"):
+        digest.update(importlib.metadata.version(package).encode())
+    return digest.hexdigest()
+
+
+def atlas_keys(figure_ids=None):
+    """Every variant of `figure_ids` (default: every figure)."""
+    return [(figure_id, params)
+            for figure_id, domain in figures.FIGURE_DOMAINS.items()
+            if figure_ids is None or figure_id in figure_ids
+            for params in domain]
+
+
+def file_name(key):
+    figure_id, params = key
+    return "-".join([figure_id, *map(str, params)]) + ".png"
+
+
+def _render(key):
+    figure_id, params = key
+    return figures.encode_figure(figures.FIGURE_BUILDERS[figure_id](*params))
+
+
+def build_atlas(directory=None, processes=None, figure_ids=None):
+    """Render every variant of `figure_ids` (default: every figure) in a
+    process pool.
+
+    Returns the `(figure_id, params) -> bytes` mapping and, when `directory`
+    is given, also writes the PNGs and a manifest there.
+    """
+    keys = atlas_keys(figure_ids)
+    # Spawned, not forked: at boot this runs inside the multi-threaded
+    # Streamlit server, and a forked child would inherit its locks mid-use
+    with ProcessPoolExecutor(max_workers=processes, mp_context=multiprocessing.get_context("spawn")) as pool:
+        entries = dict(zip(keys, pool.map(_render, keys, chunksize=4)))
+
+    if directory is not None:
+        os.makedirs(directory, exist_ok=True)
+        checksums = {}
+        for key, data in entries.items():
+            name = file_name(key)
+            with open(os.path.join(directory, name), "wb") as f:
+                f.write(data)
+            checksums[name] = hashlib.sha256(data).hexdigest()
+        manifest = {"fingerprint": fingerprint(), "files": checksums}
+        with open(os.path.join(directory, MANIFEST), "w") as f:
+            json.dump(manifest, f, indent=1, sort_keys=True)
+
+    return entries
+
+
+def load_atlas(directory, figure_ids=None):
+    """Read `figure_ids` (default: every figure) from an atlas directory,
+    raising AtlasError if it is unusable."""
+    try:
+        with open(os.path.join(directory, MANIFEST)) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError) as exc:
+        raise AtlasError(f"no readable manifest in {directory}: {exc}") from exc
+
+    if manifest.get("fingerprint") != fingerprint():
+        raise AtlasError(f"atlas in {directory} was built by different rendering code")
+
+    entries = {}
+    for key in atlas_keys(figure_ids):
+        name = file_name(key)
+        try:
+            with open(os.path.join(directory, name), "rb") as f:
+                data = f.read()
+        except OSError as exc:
+            raise AtlasError(f"atlas in {directory} is missing {name}") from exc
+        if hashlib.sha256(data).hexdigest() != manifest["files"].get(name):
+            raise AtlasError(f"atlas in {directory} has a corrupt {name}")
+        entries[key] = data
+    return entries
+
+
+def check_atlas(directory, deep=False):
+    """Return a list of problems with the atlas in `directory` (empty if ok).
+
+    With `deep`, every figure is re-rendered and compared byte for byte.
+    """
+    try:
+        entries = load_atlas(directory)
+    except AtlasError as exc:
+        return [str(exc)]
+    if not deep:
+        return []
+    return [f"{file_name(key)} differs from a fresh render"
+            for key, data in entries.items() if _render(key) != data]
+
+
+def warm_up(directory=None, processes=None, figure_ids=None):
+    """Install the atlas for `figure_ids` (default: every figure) into
+    figures, building it if needed."""
+    entries = None
+    if directory is not None:
+        try:
+            entries = load_atlas(directory, figure_ids)
+        except AtlasError:
+            entries = None
+    if entries is None:
+        entries = build_atlas(directory, processes, figure_ids)
+    figures.install_atlas(entries)
+    return len(entries)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    build = commands.add_parser("build", help="render every figure into a directory")
+    build.add_argument("directory")
+    build.add_argument("--processes", type=int, default=None)
+    check = commands.add_parser("check", help="verify an atlas against the current code")
+    check.add_argument("directory")
+    check.add_argument("--deep", action="store_true", help="re-render and compare every figure")
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        entries = build_atlas(args.directory, args.processes)
+        print(f"Wrote {len(entries)} figures to {args.directory}")
+        return 0
+
+    problems = check_atlas(args.directory, deep=args.deep)
+    for problem in problems:
+        print(problem, file=sys.stderr)
+    if not problems:
+        print(f"Atlas in {args.directory} is up to date")
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
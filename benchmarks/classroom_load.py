@@ -0,0 +1,136 @@
+"""Headless load test: a classroom of simulated students working the lesson.
+
+Each student is a Streamlit AppTest session of algebra1rules.py in this
+process, sharing its caches and submission store the way real sessions on
+one server do. A student fills in their details, moves every slider, answers
+Q1-Q12, writes the analytical answers and submits; every one of those steps
+is a rerun, and up to --concurrency students work at the same time.
+
+Reports rerun latency percentiles, throughput and the memory each extra
+session costs. AppTest always reruns the whole script, so latencies are an
+upper bound for reruns that a fragment would have kept local.
+
+    python benchmarks/classroom_load.py [--students 30] [--concurrency 10] [--max-p95-ms 0]
+"""
+import argparse
+import gc
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+REPO = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)
+APP = os.path.join(REPO, "algebra1rules.py")
+sys.path.insert(0, REPO)
+
+from figure_memory import rss_mb  # noqa: E402
+from grading import BANK  # noqa: E402
+
+SLIDERS = {"mult_slider": (1, 10), "div_slider": (2, 10), "coeff_slider": (2, 6), "div2_slider": (2, 8)}
+ANALYTICAL_KEYS = [f"analytical{i}" for i in range(1, 5)]
+ESSAY_WORDS = ("the", "number", "times", "groups", "of", "x", "divide", "pizza", "slices", "because",
+               "pattern", "multiply", "first", "then", "fraction", "means", "each", "share", "equal", "so")
+
+
+class Student:
+    """One simulated student; `latencies` holds the seconds each rerun took."""
+
+    def __init__(self, number, seed, timeout):
+        from streamlit.testing.v1 import AppTest
+
+        self.number = number
+        self.rng = random.Random(seed)
+        self.app = AppTest.from_file(APP, default_timeout=timeout)
+        self.latencies = []
+
+    def rerun(self, element=None):
+        start = time.perf_counter()
+        (element or self.app).run()
+        self.latencies.append(time.perf_counter() - start)
+        if self.app.exception:
+            raise RuntimeError(f"student {self.number}: {self.app.exception[0].message}")
+
+    def essay(self, words=80):
+        """A paragraph about as long as a real analytical answer."""
+        return " ".join(self.rng.choice(ESSAY_WORDS) for _ in range(words)).capitalize() + "."
+
+    def work_through_lesson(self):
+        app, rng = self.app, self.rng
+        self.rerun()
+        self.rerun(app.text_input(key="student_name").input(f"Student {self.number}"))
+        self.rerun(app.text_input(key="student_class").input(f"Period {self.number % 6 + 1}"))
+        self.rerun(app.text_input(key="student_date").input("10/18"))
+        for key, (low, high) in SLIDERS.items():
+            self.rerun(app.slider(key=key).set_value(rng.randint(low, high)))
+        for question in BANK.questions:
+            # Mostly right, like a class that paid attention
+            answer = question.answer if rng.random() < 0.7 else rng.randrange(len(question.options))
+            self.rerun(app.selectbox(key=question.key).set_value(answer))
+        for key in ANALYTICAL_KEYS:
+            self.rerun(app.text_area(key=key).input(self.essay()))
+        submit = next(button for button in app.button if button.label.startswith("✅ Submit"))
+        self.rerun(submit.click())
+        if not app.success:
+            raise RuntimeError(f"student {self.number}: submission was not accepted")
+
+
+def percentile_ms(values, q):
+    values = sorted(values)
+    return 1000 * values[min(len(values) - 1, int(round(q / 100 * (len(values) - 1))))]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--students", type=int, default=30)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--max-p95-ms", type=float, default=0.0, help="fail above this p95 (0: report only)")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as scratch:
+        # Submissions go to a throwaway database, not the real one
+        os.environ["MATHCRAFT_SUBMISSIONS"] = f"sqlite:///{os.path.join(scratch, 'load.db')}"
+
+        # One warm-up session pays for imports, caches and figure renders
+        Student(-1, args.seed, args.timeout).work_through_lesson()
+        gc.collect()
+        baseline = rss_mb()
+
+        students = [Student(n, args.seed + n, args.timeout) for n in range(args.students)]
+        lock = threading.Lock()
+        peak = [baseline]
+
+        def run(student):
+            student.work_through_lesson()
+            with lock:
+                peak[0] = max(peak[0], rss_mb())
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(args.concurrency) as pool:
+            list(pool.map(run, students))
+        elapsed = time.perf_counter() - start
+
+        # Every session's state is still alive here, as on a busy server
+        gc.collect()
+        per_session = (rss_mb() - baseline) / args.students
+
+    latencies = [latency for student in students for latency in student.latencies]
+    p50, p95, p99 = (percentile_ms(latencies, q) for q in (50, 95, 99))
+    print(f"students={args.students} concurrency={args.concurrency} reruns={len(latencies)} "
+          f"elapsed={elapsed:.1f}s")
+    print(f"rerun latency p50={p50:.0f}ms p95={p95:.0f}ms p99={p99:.0f}ms max={max(latencies) * 1000:.0f}ms")
+    print(f"throughput={len(latencies) / elapsed:.1f} reruns/s "
+          f"({60 * args.students / elapsed:.1f} students/min)")
+    print(f"memory baseline={baseline:.1f}MB peak={peak[0]:.1f}MB per_session={per_session:.2f}MB")
+    if args.max_p95_ms and p95 > args.max_p95_ms:
+        print(f"FAIL: p95 rerun latency {p95:.0f}ms is over {args.max_p95_ms:.0f}ms", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,85 @@
+"""Build time and size of each class data export, checked by reading it back.
+
+Fills a memory store with --rows submissions the way a real class leaves
+them: most questions chosen, some typed (free-response) and some skipped.
+Exports the store in every format in export.FORMATS through Streamlit's
+download button conversion, the way the dashboard does, reads each file
+back and fails if a row is missing or a skipped question didn't come back
+empty.
+
+    python benchmarks/export_formats.py [--rows 5000] [--chunk-size 1000]
+"""
+import argparse
+import csv
+import io
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+
+from streamlit.runtime.download_data_util import convert_data_to_bytes_and_infer_mime  # noqa: E402
+
+import export  # noqa: E402
+from grading import BANK  # noqa: E402
+from question_bank import UNANSWERED  # noqa: E402
+from submissions import MemorySubmissionStore, make_submission  # noqa: E402
+
+
+def classroom(rows, seed=0):
+    rng = random.Random(seed)
+    store = MemorySubmissionStore()
+    submissions = []
+    for n in range(rows):
+        responses = {"Name": f"Student {n}", "Date": "10/18"}
+        for question in BANK.questions:
+            roll = rng.random()
+            if roll < 0.1:
+                responses[question.id] = UNANSWERED
+            elif roll < 0.2 and question.free_response:
+                responses[question.id] = question.options[question.answer]
+            else:
+                responses[question.id] = rng.randrange(len(question.options))
+        submissions.append(make_submission(responses, f"Period {n % 6 + 1}"))
+    store.add_many(submissions)
+    return store, sum(s["responses"][BANK.questions[0].id] == UNANSWERED for s in submissions)
+
+
+def read_back(fmt, data):
+    """The rows and the count of empty first-question cells in an export."""
+    first = BANK.questions[0].id
+    if fmt == "CSV":
+        rows = list(csv.DictReader(io.StringIO(data.decode("utf-8"))))
+        return len(rows), sum(row[first] == "" for row in rows)
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    table = pq.read_table(io.BytesIO(data)) if fmt == "Parquet" else pa.ipc.open_stream(data).read_all()
+    return table.num_rows, table.column(first).null_count
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--chunk-size", type=int, default=export.CHUNK_SIZE)
+    args = parser.parse_args(argv)
+
+    store, skipped = classroom(args.rows)
+    failed = False
+    for fmt in export.FORMATS:
+        start = time.perf_counter()
+        # What "Download Class Data" hands to Streamlit, converted the way the button converts it
+        data, _ = convert_data_to_bytes_and_infer_mime(export.export_bytes(store, fmt, args.chunk_size),
+                                                       TypeError(f"{fmt}: Streamlit can't download this type"))
+        elapsed = time.perf_counter() - start
+        rows, empty = read_back(fmt, data)
+        ok = rows == args.rows and empty == skipped
+        failed |= not ok
+        print(f"{fmt:<8} {elapsed * 1000:7.0f}ms {len(data) / 1024:9.1f}KB rows={rows} "
+              f"skipped {BANK.questions[0].id}={empty}/{skipped} {'ok' if ok else 'FAIL'}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
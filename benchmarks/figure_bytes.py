@@ -0,0 +1,94 @@
+"""Bytes sent to the browser per rerun for each way of rendering the figures.
+
+For a sample of slider positions, renders every figure in every encoding and
+measures what Streamlit actually sends for it: st.image downsizes and
+re-encodes rasters wider than its content column, and inlines SVG and WebP
+as data URLs. "pyplot" is the original st.pyplot output (a 200 dpi PNG).
+
+A rerun triggered by one slider re-sends that slider's figure, so the
+per-figure columns are the bytes per slider rerun; "page" is what a full
+rerun of the lesson sends with the renderers in --renderers.
+
+    python benchmarks/figure_bytes.py [--variants 5] [--renderers fig1=svg,fig2=svg,fig4=png8]
+"""
+import argparse
+import base64
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+
+import figures  # noqa: E402
+import svg_figures  # noqa: E402
+
+RENDERERS = ("pyplot",) + figures.ENCODINGS + ("svg",)
+
+
+def shipped_bytes(renderer, data):
+    """Size of what st.image sends for `data` rendered by `renderer`."""
+    from streamlit.elements.lib.image_utils import _ensure_image_size_and_format, _validate_image_format_string
+    from streamlit.elements.lib.layout_utils import LayoutConfig
+
+    if renderer in ("svg", "webp"):
+        mime = "svg+xml" if renderer == "svg" else "webp"
+        return len(f"data:image/{mime};base64,") + len(base64.b64encode(data))
+    # st.pyplot and the original st.image call let Streamlit pick the format
+    output_format = "auto" if renderer == "pyplot" else "PNG"
+    image_format = _validate_image_format_string(data, output_format)
+    return len(_ensure_image_size_and_format(data, LayoutConfig(width="stretch"), image_format))
+
+
+def render(renderer, figure_id, params):
+    if renderer == "svg":
+        return svg_figures.SVG_BUILDERS[figure_id].__wrapped__(*params).encode()
+    fig = figures.FIGURE_BUILDERS[figure_id](*params)
+    if renderer == "pyplot":
+        return figures.figure_to_png(fig)
+    return figures.encode_figure(fig, renderer)
+
+
+def sample(domain, count):
+    domain = list(domain)
+    step = max(1, len(domain) // count)
+    return domain[::step][:count]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--variants", type=int, default=5, help="slider positions sampled per figure")
+    parser.add_argument("--renderers", default="fig1=svg,fig2=svg,fig4=png8")
+    args = parser.parse_args(argv)
+    chosen = dict(item.split("=") for item in args.renderers.split(","))
+
+    sizes, seconds = {}, {}
+    for renderer in RENDERERS:
+        for figure_id, domain in figures.FIGURE_DOMAINS.items():
+            if renderer == "svg" and figure_id not in svg_figures.SVG_BUILDERS:
+                continue
+            shipped, timings = [], []
+            for params in sample(domain, args.variants):
+                start = time.perf_counter()
+                data = render(renderer, figure_id, params)
+                timings.append(time.perf_counter() - start)
+                shipped.append(shipped_bytes(renderer, data))
+            sizes[renderer, figure_id] = statistics.mean(shipped)
+            seconds[renderer, figure_id] = statistics.mean(timings)
+
+    print(f"{'renderer':<8}" + "".join(f"{f:>16}" for f in figures.FIGURE_DOMAINS) + "      render ms")
+    for renderer in RENDERERS:
+        row = [f"{sizes[renderer, f] / 1024:13.1f}KB" if (renderer, f) in sizes else f"{'-':>15}"
+               for f in figures.FIGURE_DOMAINS]
+        times = [seconds[key] for key in seconds if key[0] == renderer]
+        print(f"{renderer:<8}" + " ".join(row) + f"  {1000 * statistics.mean(times):10.0f}")
+
+    before = sum(sizes["pyplot", f] for f in figures.FIGURE_DOMAINS)
+    after = sum(sizes[chosen.get(f, figures.DEFAULT_ENCODING), f] for f in figures.FIGURE_DOMAINS)
+    print(f"page: pyplot={before / 1024:.1f}KB {args.renderers}={after / 1024:.1f}KB "
+          f"({before / after:.1f}x smaller)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
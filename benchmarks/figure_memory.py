@@ -0,0 +1,85 @@
+"""Memory regression check for figure rendering across simulated reruns.
+
+Renders the lesson figures over and over with the render cache bypassed
+(the worst case: every rerun is a cache miss) and fails if the process RSS
+keeps growing or any figure is left registered with pyplot.
+
+Before measuring, every variant of every figure is rendered once and then
+one full cycle of reruns is simulated, so font and text layout caches and
+the allocator's high-water mark are already reached; --warmup only adds
+reruns on top. Growth is reported in total and per rerun, and per rerun is
+what shows a leak.
+
+    python benchmarks/figure_memory.py [--reruns 100] [--max-growth-mb 40] [--max-kb-per-rerun 50]
+"""
+import argparse
+import gc
+import itertools
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+
+import figures  # noqa: E402
+
+
+def rss_mb():
+    """Current resident set size of this process in MB (Linux)."""
+    with open("/proc/self/statm") as f:
+        resident_pages = int(f.read().split()[1])
+    return resident_pages * os.sysconf("SC_PAGE_SIZE") / 2**20
+
+
+def open_pyplot_figures():
+    pyplot = sys.modules.get("matplotlib.pyplot")
+    return len(pyplot.get_fignums()) if pyplot else 0
+
+
+def simulate_reruns(count):
+    """One rerun renders fig1, fig2 and fig4 for the next slider positions."""
+    slider_positions = zip(
+        itertools.cycle(figures.FIGURE_DOMAINS["fig1"]),
+        itertools.cycle(figures.FIGURE_DOMAINS["fig2"]),
+        itertools.cycle(figures.FIGURE_DOMAINS["fig4"]),
+    )
+    for fig1, fig2, fig4 in itertools.islice(slider_positions, count):
+        for figure_id, params in (("fig1", fig1), ("fig2", fig2), ("fig4", fig4)):
+            figures.figure_to_png(figures.FIGURE_BUILDERS[figure_id](*params))
+
+
+def warm_up(extra_reruns=0):
+    for figure_id, domain in figures.FIGURE_DOMAINS.items():
+        for params in domain:
+            figures.figure_to_png(figures.FIGURE_BUILDERS[figure_id](*params))
+    simulate_reruns(max(map(len, figures.FIGURE_DOMAINS.values())) + extra_reruns)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--reruns", type=int, default=100)
+    parser.add_argument("--warmup", type=int, default=0, help="extra warm-up reruns")
+    parser.add_argument("--max-growth-mb", type=float, default=40.0)
+    parser.add_argument("--max-kb-per-rerun", type=float, default=50.0)
+    args = parser.parse_args(argv)
+
+    warm_up(args.warmup)
+    gc.collect()
+    baseline = rss_mb()
+
+    simulate_reruns(args.reruns)
+    gc.collect()
+    growth = rss_mb() - baseline
+    per_rerun = 1024 * growth / args.reruns
+    leaked = open_pyplot_figures()
+
+    print(f"reruns={args.reruns} baseline_rss={baseline:.1f}MB growth={growth:.1f}MB "
+          f"({per_rerun:.1f}KB/rerun) pyplot_figures={leaked}")
+    if leaked or growth > args.max_growth_mb or per_rerun > args.max_kb_per_rerun:
+        print(f"FAIL: memory is not bounded (limits {args.max_growth_mb:.0f}MB growth, "
+              f"{args.max_kb_per_rerun:.0f}KB per rerun, 0 pyplot figures)", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,77 @@
+"""Cold-start regression check for importing a lesson.
+
+Imports the lesson module in fresh interpreters under `python -X importtime`
+(Streamlit is imported first, since every worker pays for it regardless),
+and fails if the lesson's own import time goes over budget or if it pulls in
+a library that should only load on the code paths that need it.
+
+    python benchmarks/import_time.py [--module algebra_notation] [--runs 5] [--max-ms 250]
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+REPO = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)
+
+# Libraries a student's first page view must not import
+DEFERRED = ("matplotlib", "pandas", "pyarrow", "PIL")
+
+
+def import_times(module):
+    """[(depth, name, self_us, cumulative_us)] for one cold import of `module`."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c",
+         f"import streamlit, streamlit.components.v1; import {module}"],
+        cwd=REPO, capture_output=True, text=True, check=True,
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        rows.append((depth, name.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def lesson_breakdown(rows, module):
+    """The module's cumulative time and its direct imports, slowest first."""
+    children = []
+    for depth, name, _, cumulative_us in rows:
+        if depth == 0 and name == module:
+            return cumulative_us, sorted(children, key=lambda child: -child[1])
+        if depth == 0:
+            children = []
+        elif depth == 1:
+            children.append((name, cumulative_us))
+    raise ValueError(f"{module} was not imported")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--module", default="algebra_notation")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--max-ms", type=float, default=250.0)
+    args = parser.parse_args(argv)
+
+    # The fastest run is the least disturbed by whatever else the machine is doing
+    runs = [import_times(args.module) for _ in range(args.runs)]
+    rows = min(runs, key=lambda rows: lesson_breakdown(rows, args.module)[0])
+    total_us, children = lesson_breakdown(rows, args.module)
+    deferred = sorted({name.split(".")[0] for _, name, _, _ in rows} & set(DEFERRED))
+
+    print(f"module={args.module} runs={args.runs} import={total_us / 1000:.1f}ms")
+    for name, cumulative_us in children[:8]:
+        print(f"  {name:<24} {cumulative_us / 1000:8.1f}ms")
+    if deferred:
+        print(f"FAIL: imported at startup: {', '.join(deferred)}", file=sys.stderr)
+        return 1
+    if total_us / 1000 > args.max_ms:
+        print(f"FAIL: import took {total_us / 1000:.0f}ms (budget {args.max_ms:.0f}ms)", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,96 @@
+"""Memory per student session, for sizing sessions per worker.
+
+Runs --students simulated students through the whole lesson (see
+classroom_load.py), keeps their sessions alive, and reports:
+
+- state: the deep size of each session's Streamlit session state, widget
+  values and widget metadata included (shared callables, types and
+  modules are not counted)
+- heap: Python allocations per session, traced with tracemalloc; this also
+  counts AppTest's copy of the rendered page, which a real server keeps as
+  outgoing messages instead
+- rss: growth of the process RSS per session
+
+    python benchmarks/session_memory.py [--students 20] [--max-state-kb 0]
+"""
+import argparse
+import gc
+import os
+import sys
+import tempfile
+import tracemalloc
+import types
+
+from classroom_load import Student
+from figure_memory import rss_mb
+
+SHARED = (type, types.ModuleType, types.FunctionType, types.BuiltinFunctionType, types.MethodType,
+          types.CodeType, types.FrameType)
+
+
+def deep_size(root):
+    """Bytes reachable from `root`, skipping objects shared between sessions."""
+    seen = set()
+    stack = [root]
+    total = 0
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen or isinstance(obj, SHARED):
+            continue
+        seen.add(id(obj))
+        total += sys.getsizeof(obj)
+        stack.extend(gc.get_referents(obj))
+    return total
+
+
+def session_state(student):
+    """The SessionState behind AppTest's wrappers (one or two, depending on
+    the Streamlit version): user values plus widget state."""
+    state = student.app.session_state
+    while hasattr(state, "_state"):
+        state = state._state
+    return state
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--students", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--max-state-kb", type=float, default=0.0, help="fail above this (0: report only)")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as scratch:
+        os.environ["MATHCRAFT_SUBMISSIONS"] = f"sqlite:///{os.path.join(scratch, 'memory.db')}"
+
+        # Warm up imports and process-wide caches before measuring anything
+        Student(-1, args.seed, args.timeout).work_through_lesson()
+        gc.collect()
+        baseline_rss = rss_mb()
+        tracemalloc.start()
+        baseline_heap = tracemalloc.get_traced_memory()[0]
+
+        students = []
+        for n in range(args.students):
+            student = Student(n, args.seed + n, args.timeout)
+            student.work_through_lesson()
+            students.append(student)
+
+        gc.collect()
+        heap = (tracemalloc.get_traced_memory()[0] - baseline_heap) / args.students
+        tracemalloc.stop()
+        rss = (rss_mb() - baseline_rss) / args.students
+        state = sum(deep_size(session_state(student)) for student in students) / args.students
+        values = sum(deep_size(session_state(student).filtered_state) for student in students) / args.students
+
+    print(f"students={args.students}")
+    print(f"per session: state={state / 1024:.1f}KB (values {values / 1024:.1f}KB) "
+          f"heap={heap / 1024:.1f}KB rss={rss * 1024:.0f}KB")
+    if args.max_state_kb and state / 1024 > args.max_state_kb:
+        print(f"FAIL: session state is {state / 1024:.1f}KB (limit {args.max_state_kb:.0f}KB)", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,90 @@
+"""Submit latency during an end-of-period burst, inline and write-behind.
+
+--students threads each submit a graded record at the same moment, as a
+class does when the bell rings. "inline" calls add() on a SQLite store
+directly, the way "Submit My Work" used to; "write-behind" goes through the
+WriteBehindStore the lesson uses now, where add() only queues the record.
+--fsync-ms adds that much latency to every transaction, to stand in for a
+slower disk than the one the benchmark happens to run on.
+
+    python benchmarks/submit_burst.py [--students 300] [--fsync-ms 0] [--max-p99-ms 0]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+
+from grading import BANK  # noqa: E402
+from submissions import SQLiteSubmissionStore, WriteBehindStore, make_submission  # noqa: E402
+
+
+class SlowDiskStore(SQLiteSubmissionStore):
+    def __init__(self, path, delay):
+        super().__init__(path)
+        self.delay = delay
+
+    def add_many(self, submissions):
+        time.sleep(self.delay)
+        super().add_many(submissions)
+
+
+def burst(store, submissions):
+    """Submit everything at once from one thread each; returns each add()'s seconds."""
+    start = threading.Barrier(len(submissions))
+    latencies = [0.0] * len(submissions)
+
+    def submit(index):
+        start.wait()
+        began = time.perf_counter()
+        store.add(submissions[index])
+        latencies[index] = time.perf_counter() - began
+
+    threads = [threading.Thread(target=submit, args=(i,)) for i in range(len(submissions))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return sorted(latencies)
+
+
+def percentile_ms(values, q):
+    return 1000 * values[min(len(values) - 1, int(round(q / 100 * (len(values) - 1))))]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--students", type=int, default=300)
+    parser.add_argument("--fsync-ms", type=float, default=0.0)
+    parser.add_argument("--max-p99-ms", type=float, default=0.0, help="fail above this p99 (0: report only)")
+    args = parser.parse_args(argv)
+
+    responses = {"Name": "Student", "Date": "10/18", **{q.id: q.answer for q in BANK.questions}}
+    submissions = [make_submission({**responses, "Name": f"Student {n}"}, f"Period {n % 6 + 1}")
+                   for n in range(args.students)]
+    p99 = {}
+    with tempfile.TemporaryDirectory() as scratch:
+        for mode in ("inline", "write-behind"):
+            store = SlowDiskStore(os.path.join(scratch, f"{mode}.db"), args.fsync_ms / 1000)
+            if mode == "write-behind":
+                store = WriteBehindStore(store)
+            began = time.perf_counter()
+            latencies = burst(store, submissions)
+            accepted = time.perf_counter() - began
+            store.close()
+            stored = time.perf_counter() - began
+            p99[mode] = percentile_ms(latencies, 99)
+            batches = f" batches={store.batches}" if mode == "write-behind" else ""
+            print(f"{mode:<12} p50={percentile_ms(latencies, 50):.1f}ms p99={p99[mode]:.1f}ms "
+                  f"max={1000 * latencies[-1]:.1f}ms accepted={accepted:.2f}s stored={stored:.2f}s{batches}")
+    if args.max_p99_ms and p99["write-behind"] > args.max_p99_ms:
+        print(f"FAIL: write-behind p99 {p99['write-behind']:.1f}ms is over {args.max_p99_ms:.1f}ms", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
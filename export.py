@@ -0,0 +1,112 @@
+"""Class data exports, streamed from the submission store in chunks.
+
+Exports are only generated when a teacher actually asks for one, and rows
+are pulled from the store a chunk at a time into a spooled temporary file,
+so a large class history never has to sit in memory as one string.
+"""
+import csv
+import io
+import tempfile
+
+from grading import BANK, QUESTION_IDS
+
+CHUNK_SIZE = 1000
+SPOOL_SIZE = 8 * 2**20
+
+EXPORT_COLUMNS = (
+    ["Class", "Submitted", "Score", "Name", "Date"]
+    + QUESTION_IDS
+    + [question.id for question in BANK.analytical]
+)
+
+FORMATS = {
+    # label: (file extension, mime type)
+    "CSV": ("csv", "text/csv"),
+    "Parquet": ("parquet", "application/vnd.apache.parquet"),
+    "Arrow": ("arrow", "application/vnd.apache.arrow.stream"),
+}
+
+
+def iter_csv(store, chunk_size=CHUNK_SIZE, **filters):
+    """Yield the export as CSV text, one chunk of rows at a time."""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, EXPORT_COLUMNS, extrasaction="ignore", lineterminator="\n")
+    writer.writeheader()
+    for rows in store.iter_chunks(chunk_size=chunk_size, **filters):
+        writer.writerows(rows)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def write_csv(store, out, chunk_size=CHUNK_SIZE, **filters):
+    for text in iter_csv(store, chunk_size, **filters):
+        out.write(text.encode("utf-8"))
+
+
+def _record_batches(store, chunk_size, filters):
+    import pyarrow as pa
+
+    schema = pa.schema([(column, pa.int64() if column == "Score" else pa.string())
+                        for column in EXPORT_COLUMNS])
+    batches = (
+        pa.RecordBatch.from_pylist([{c: _cell(c, row.get(c)) for c in EXPORT_COLUMNS} for row in rows], schema=schema)
+        for rows in store.iter_chunks(chunk_size=chunk_size, **filters)
+    )
+    return schema, batches
+
+
+def _cell(column, value):
+    """`value` for the schema: Score stays an int, everything else is text.
+    An answer that isn't option text (an old option index, say) would
+    otherwise fail the whole batch."""
+    if value is None or column == "Score":
+        return value
+    return str(value)
+
+
+def write_parquet(store, out, chunk_size=CHUNK_SIZE, **filters):
+    """Write one Parquet row group per chunk (requires pyarrow)."""
+    import pyarrow.parquet as pq
+
+    schema, batches = _record_batches(store, chunk_size, filters)
+    with pq.ParquetWriter(out, schema) as writer:
+        for batch in batches:
+            writer.write_batch(batch)
+
+
+def write_arrow(store, out, chunk_size=CHUNK_SIZE, **filters):
+    """Write an Arrow IPC stream, one record batch per chunk (requires pyarrow)."""
+    import pyarrow as pa
+
+    schema, batches = _record_batches(store, chunk_size, filters)
+    with pa.ipc.new_stream(out, schema) as writer:
+        for batch in batches:
+            writer.write_batch(batch)
+
+
+WRITERS = {"CSV": write_csv, "Parquet": write_parquet, "Arrow": write_arrow}
+
+
+def export(store, fmt, chunk_size=CHUNK_SIZE, **filters):
+    """Return a file object, positioned at the start, holding the export.
+
+    Small exports stay in memory; larger ones spill to a temporary file.
+    """
+    out = tempfile.SpooledTemporaryFile(max_size=SPOOL_SIZE)
+    WRITERS[fmt](store, out, chunk_size, **filters)
+    out.seek(0)
+    return out
+
+
+def export_bytes(store, fmt, chunk_size=CHUNK_SIZE, **filters):
+    """The export as bytes, for st.download_button.
+
+    Streamlit reads whatever the button's callable returns into bytes
+    anyway, and only accepts bytes and a few concrete stream types, not a
+    SpooledTemporaryFile.
+    """
+    with export(store, fmt, chunk_size, **filters) as out:
+        return out.read()
@@ -0,0 +1,346 @@
+"""Figure builders for the lesson visuals.
+
+Each builder is a pure function of its slider inputs, so the rendered PNG
+bytes can be cached and shared by every session served from this process.
+matplotlib is only imported once a figure actually has to be drawn, which
+most processes never do when the atlas or the SVG renderers are in use.
+
+Figures are rasterized for the width Streamlit actually shows them at rather
+than at st.pyplot's 200 dpi, and encoded as palette PNGs by default: about
+an eighth of the bytes, and small enough that Streamlit sends them as they
+are instead of downsizing and re-encoding them on every rerun.
+"""
+import io
+import itertools
+import threading
+from collections import Counter, OrderedDict
+
+from notation import compile_expression, mixed_number
+
+# Rendering options that match st.pyplot's defaults
+PNG_DPI = 200
+CACHE_SIZE = 64
+
+# Streamlit's widest content column in CSS pixels, doubled for high-DPI
+# screens. Anything wider is downsized by Streamlit itself on every rerun.
+TARGET_WIDTH = 2 * 730
+
+# "png": matplotlib's own RGBA PNG, "png8": a palette PNG, "webp": lossy WebP
+ENCODINGS = ("png", "png8", "webp")
+DEFAULT_ENCODING = "png8"
+PALETTE_COLORS = 64
+WEBP_QUALITY = 80
+
+
+def groups_of_x_figure(multiplier):
+    """fig1: `multiplier` groups of x, the translation, and the pattern panel."""
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=(15, 5))
+    ax1, ax2, ax3 = fig.subplots(1, 3)
+
+    # Visual 1: 3x means 3 times x
+    x_value = 4  # We'll use 4 as our x value for visualization
+    groups = multiplier
+    items_per_group = x_value
+
+    # Draw groups of x's
+    for group in range(groups):
+        for item in range(items_per_group):
+            x_pos = group * 1.5
+            y_pos = item * 0.3
+            ax1.text(x_pos, y_pos, 'x', fontsize=20, ha='center', va='center',
+                     bbox=dict(boxstyle="circle,pad=0.1", facecolor="lightblue"))
+
+    ax1.set_xlim(-0.5, groups * 1.5)
+    ax1.set_ylim(-0.5, items_per_group * 0.3 + 0.5)
+    ax1.set_title(f'{multiplier}x means {multiplier} groups of x\n(if x = {x_value}, then {multiplier}x = {multiplier} · {x_value} = {multiplier * x_value})',
+                  fontsize=14, fontweight='bold')
+    ax1.axis('off')
+
+    # Visual 2: Show the translation
+    ax2.text(0.5, 0.7, f'{multiplier}x', fontsize=36, ha='center', va='center', fontweight='bold', color='blue')
+    ax2.text(0.5, 0.5, '=', fontsize=24, ha='center', va='center')
+    ax2.text(0.5, 0.3, f'{multiplier} · x', fontsize=24, ha='center', va='center', color='red')
+    ax2.set_xlim(0, 1)
+    ax2.set_ylim(0, 1)
+    ax2.set_title('Algebra Notation ↔ Regular Math', fontsize=14, fontweight='bold')
+    ax2.axis('off')
+
+    # Visual 3: Multiple examples
+    examples = [f'{multiplier}x = {multiplier} · x', f'{multiplier}y = {multiplier} · y', f'{multiplier}n = {multiplier} · n']
+    for i, example in enumerate(examples):
+        ax3.text(0.5, 0.8 - i*0.2, example, fontsize=16, ha='center', va='center',
+                 bbox=dict(boxstyle="round,pad=0.3", facecolor="lightyellow"))
+
+    ax3.set_xlim(0, 1)
+    ax3.set_ylim(0, 1)
+    ax3.set_title('Pattern Recognition', fontsize=14, fontweight='bold')
+    ax3.axis('off')
+
+    return fig
+
+
+def division_groups_figure(divisor):
+    """fig2: 24 items shared into `divisor` colored groups."""
+    from matplotlib.figure import Figure
+    from matplotlib.patches import Circle, Rectangle
+
+    fig = Figure(figsize=(14, 8))
+    ax = fig.subplots()
+
+    # Set up the layout
+    n_value = 24
+    groups = divisor
+    # Exact share per group; only whole items are drawn
+    share = compile_expression(f'n/{divisor}')(n=n_value)
+    items_per_group = int(share)
+
+    # Title and explanation at the top
+    ax.text(0.5, 0.95, f'n/{divisor} means n ÷ {divisor}',
+            transform=ax.transAxes, fontsize=24, ha='center', va='top', fontweight='bold', color='blue')
+    ax.text(0.5, 0.88, f'If n = {n_value}, then n/{divisor} = {n_value} ÷ {divisor} = {mixed_number(share)}',
+            transform=ax.transAxes, fontsize=18, ha='center', va='top', color='red')
+
+    # Draw large, clear groups
+    colors = ['#FF6B6B', '#4ECDC4', '#45B7D1', '#96CEB4', '#FECA57', '#FF9FF3', '#54A0FF', '#5F27CD']
+    group_width = 0.8 / groups  # Divide the width among groups
+    item_size = min(group_width * 0.8, 0.08)  # Reasonable item size
+
+    for group in range(groups):
+        # Group background
+        group_x = 0.1 + group * group_width
+        group_color = colors[group % len(colors)]
+
+        # Draw background rectangle for each group
+        rect = Rectangle((group_x, 0.3), group_width * 0.9, 0.4,
+                         facecolor=group_color, alpha=0.2, edgecolor=group_color, linewidth=2)
+        ax.add_patch(rect)
+
+        # Add group label
+        ax.text(group_x + group_width * 0.45, 0.75, f'Group {group+1}',
+                ha='center', va='center', fontsize=12, fontweight='bold', color=group_color)
+
+        # Draw items in each group
+        items_per_row = 3
+        for item in range(items_per_group):
+            row = item // items_per_row
+            col = item % items_per_row
+
+            item_x = group_x + (col + 0.5) * (group_width * 0.9 / items_per_row)
+            item_y = 0.35 + row * 0.08
+
+            circle = Circle((item_x, item_y), item_size/2,
+                            facecolor=group_color, edgecolor='black', linewidth=1)
+            ax.add_patch(circle)
+
+        # Show count for each group
+        ax.text(group_x + group_width * 0.45, 0.2, f'{mixed_number(share)} items',
+                ha='center', va='center', fontsize=11, fontweight='bold')
+
+    # Add the equation at the bottom
+    ax.text(0.5, 0.1, f'{n_value} items ÷ {divisor} groups = {mixed_number(share)} items per group',
+            transform=ax.transAxes, fontsize=16, ha='center', va='center',
+            bbox=dict(boxstyle="round,pad=0.5", facecolor="lightyellow", edgecolor="orange"))
+
+    ax.set_xlim(0, 1)
+    ax.set_ylim(0, 1)
+    ax.axis('off')
+
+    return fig
+
+
+def combined_figure(coeff, divisor2):
+    """fig4: the order of operations for coeff·x/divisor2 and its grouping."""
+    import matplotlib
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=(12, 5))
+    ax7, ax8 = fig.subplots(1, 2)
+
+    # Visual 1: 3x/4 breakdown
+    ax7.text(0.5, 0.9, f'{coeff}x/{divisor2}', fontsize=32, ha='center', va='center', fontweight='bold', color='purple')
+    ax7.text(0.5, 0.7, '↓', fontsize=24, ha='center', va='center')
+    ax7.text(0.5, 0.6, f'({coeff} · x) ÷ {divisor2}', fontsize=18, ha='center', va='center', color='blue')
+    ax7.text(0.5, 0.4, 'First multiply, then divide!', fontsize=14, ha='center', va='center',
+             bbox=dict(boxstyle="round,pad=0.3", facecolor="lightgreen"))
+
+    if_x = 8
+    result = compile_expression(f'{coeff}x/{divisor2}')(x=if_x)
+    ax7.text(0.5, 0.2, f'If x = {if_x}:', fontsize=14, ha='center', va='center')
+    ax7.text(0.5, 0.1, f'{coeff}x/{divisor2} = ({coeff} · {if_x}) ÷ {divisor2} = {coeff * if_x} ÷ {divisor2} = {mixed_number(result)}',
+             fontsize=12, ha='center', va='center', color='red')
+
+    ax7.set_xlim(0, 1)
+    ax7.set_ylim(0, 1)
+    ax7.set_title('Order of Operations', fontsize=14, fontweight='bold')
+    ax7.axis('off')
+
+    # Visual 2: Visual representation
+    # Show coeff groups of x, then divide by divisor2
+    total_x = coeff * if_x
+    items_per_group = int(result)
+
+    for group in range(divisor2):
+        group_color = matplotlib.colormaps['Set1'](group / divisor2)
+        for item in range(items_per_group):
+            x_pos = group + item * 0.1
+            y_pos = 0.5 + group * 0.1
+            ax8.text(x_pos, y_pos, 'x', fontsize=12, ha='center', va='center',
+                     bbox=dict(boxstyle="circle,pad=0.05", facecolor=group_color))
+
+    ax8.text(2, 0.8, f'{coeff}x = {total_x} total x\'s', fontsize=12, ha='center', va='center')
+    ax8.text(2, 0.2, f'÷ {divisor2} = {mixed_number(result)} in each group', fontsize=12, ha='center', va='center')
+
+    ax8.set_xlim(-0.5, 4)
+    ax8.set_ylim(0, 1)
+    ax8.set_title(f'Visual: {coeff}x/{divisor2} with x = {if_x}', fontsize=14, fontweight='bold')
+    ax8.axis('off')
+
+    return fig
+
+
+FIGURE_BUILDERS = {
+    "fig1": groups_of_x_figure,
+    "fig2": division_groups_figure,
+    "fig4": combined_figure,
+}
+
+# Every parameter tuple the lesson sliders can produce
+FIGURE_DOMAINS = {
+    "fig1": [(multiplier,) for multiplier in range(1, 11)],
+    "fig2": [(divisor,) for divisor in range(2, 11)],
+    "fig4": list(itertools.product(range(2, 7), range(2, 9))),
+}
+
+
+class RenderCache:
+    """A thread-safe, size-bounded LRU mapping of render keys to PNG bytes."""
+
+    def __init__(self, maxsize=CACHE_SIZE):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            data = self._entries.get(key)
+            if data is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return data
+
+    def put(self, key, data):
+        with self._lock:
+            self._entries[key] = data
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+
+# Shared by every Streamlit session in this process
+render_cache = RenderCache()
+
+# Prebuilt renders installed by atlas.py; consulted before the LRU
+_atlas = {}
+
+# Cache shared with other worker processes, installed by shared_cache.py;
+# consulted after the LRU
+_shared = None
+
+# Per figure: how often it was served from the atlas and how often drawn
+atlas_hits = Counter()
+render_counts = Counter()
+_stats_lock = threading.Lock()
+
+
+def install_atlas(entries):
+    """Serve the `(figure_id, params) -> bytes` mapping without rendering."""
+    _atlas.clear()
+    _atlas.update(entries)
+
+
+def install_shared_cache(cache):
+    """Look renders up in `cache` (None: no shared cache) before drawing them."""
+    global _shared
+    _shared = cache
+
+
+def figure_to_png(fig, dpi=PNG_DPI):
+    """Rasterize `fig` the way st.pyplot does and release its artists.
+
+    Builders create bare Figures that pyplot's global figure manager never
+    sees, so nothing outlives the render once the caller drops `fig`.
+    """
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    buffer = io.BytesIO()
+    try:
+        FigureCanvasAgg(fig)
+        fig.savefig(buffer, format="png", dpi=dpi, bbox_inches="tight")
+    finally:
+        fig.clear()
+    return buffer.getvalue()
+
+
+def encode_figure(fig, encoding=DEFAULT_ENCODING, width=TARGET_WIDTH):
+    """Rasterize `fig` about `width` pixels wide (None: at PNG_DPI) and encode it."""
+    dpi = min(PNG_DPI, width / fig.get_figwidth()) if width else PNG_DPI
+    png = figure_to_png(fig, dpi)
+    if encoding == "png":
+        return png
+
+    from PIL import Image
+
+    image = Image.open(io.BytesIO(png)).convert("RGB")
+    buffer = io.BytesIO()
+    if encoding == "png8":
+        # Flat fills and antialiased edges: no dithering keeps the file small
+        image = image.quantize(PALETTE_COLORS, method=Image.Quantize.FASTOCTREE, dither=Image.Dither.NONE)
+        image.save(buffer, format="PNG", optimize=True)
+    elif encoding == "webp":
+        image.save(buffer, format="WEBP", quality=WEBP_QUALITY, method=4)
+    else:
+        raise ValueError(f"unknown figure encoding {encoding!r}")
+    return buffer.getvalue()
+
+
+def render_image(figure_id, *params, encoding=DEFAULT_ENCODING, width=TARGET_WIDTH):
+    """Return the encoded bytes for `figure_id` built from `params`, cached.
+
+    The atlas holds the default encoding; anything else goes through the LRU
+    under a key that includes the encoding and width. LRU misses are looked
+    up in the shared cache, when one is installed, before rendering.
+    """
+    default = (encoding, width) == (DEFAULT_ENCODING, TARGET_WIDTH)
+    key = (figure_id, params) if default else (figure_id, params, encoding, width)
+    data = _atlas.get(key) if default else None
+    if data is not None:
+        with _stats_lock:
+            atlas_hits[figure_id] += 1
+        return data
+    data = render_cache.get(key)
+    if data is not None:
+        return data
+    shared = _shared
+    data = shared.get(key) if shared is not None else None
+    if data is None:
+        data = encode_figure(FIGURE_BUILDERS[figure_id](*params), encoding, width)
+        if shared is not None:
+            shared.put(key, data)
+        with _stats_lock:
+            render_counts[figure_id] += 1
+    render_cache.put(key, data)
+    return data
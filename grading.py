@@ -0,0 +1,102 @@
+"""Answer key and vectorized grading for the Q1-Q12 practice questions.
+
+All grading goes through one boolean correctness matrix (students x
+questions) of integer option comparisons: correctness() scores a student's
+check (SessionRecord.score) and every submission (make_submission), whose
+rows the dashboard's running totals (ScoreAggregate) are built from.
+Typed free-response answers are first matched to the option they are
+equivalent to (see Question.encode), so they grade the same way.
+"""
+from collections import Counter
+from typing import NamedTuple
+
+import numpy as np
+
+from question_bank import load_bank
+
+BANK = load_bank()
+ANSWER_KEY = BANK.answer_key
+QUESTION_IDS = BANK.ids
+
+
+class GradeReport(NamedTuple):
+    correct: np.ndarray      # bool, one row per student, one column per question
+    scores: np.ndarray       # correct answers per student
+    difficulty: np.ndarray   # share of students answering each question correctly
+    class_average: float     # mean score, nan when there are no students
+
+
+def correctness(answers, answer_key=ANSWER_KEY):
+    """Compare an (students x questions) array of option indices with the key."""
+    return np.asarray(answers, dtype=np.int8).reshape(-1, len(answer_key)) == answer_key
+
+
+def grade(answers, answer_key=ANSWER_KEY):
+    correct = correctness(answers, answer_key)
+    scores = correct.sum(axis=1)
+    if len(scores):
+        return GradeReport(correct, scores, correct.mean(axis=0), float(scores.mean()))
+    return GradeReport(correct, scores, np.full(correct.shape[1], np.nan), float("nan"))
+
+
+def typed_answers(df):
+    """Every distinct typed answer in a responses DataFrame, as (question id,
+    answer, students, correct) rows; each question's answers are graded in
+    one batch however many students typed them.
+
+    A row's "Typed" column lists the questions it typed. Rows from before
+    that column have none, and there only text that isn't an option counts
+    (older submissions stored chosen options as their text).
+    """
+    rows = []
+    typed_flags = df["Typed"].tolist() if "Typed" in df else [None] * len(df)
+    for question in BANK.questions:
+        if not question.free_response or question.id not in df:
+            continue
+        counts = Counter(
+            value for value, typed in zip(df[question.id], typed_flags)
+            if isinstance(value, str) and value.strip()
+            and (question.id in typed.split(",") if isinstance(typed, str) else value not in question.options)
+        ).most_common()
+        codes = question.encode([answer for answer, _ in counts])
+        rows.extend((question.id, answer, students, bool(code == question.answer))
+                    for (answer, students), code in zip(counts, codes))
+    return rows
+
+
+class ScoreAggregate:
+    """Running class totals, updated one graded submission at a time.
+
+    Holds per-question correct counts and a score histogram, so averages and
+    difficulty come out in O(questions) however many submissions there are.
+    """
+
+    def __init__(self, questions=len(QUESTION_IDS)):
+        self.count = 0
+        self.correct_counts = np.zeros(questions, dtype=np.int64)
+        self.histogram = np.zeros(questions + 1, dtype=np.int64)
+
+    def add(self, correct):
+        correct = np.asarray(correct, dtype=bool).reshape(-1, len(self.correct_counts))
+        self.count += len(correct)
+        self.correct_counts += correct.sum(axis=0)
+        self.histogram += np.bincount(correct.sum(axis=1), minlength=len(self.histogram))
+
+    def merge(self, other):
+        self.count += other.count
+        self.correct_counts += other.correct_counts
+        self.histogram += other.histogram
+
+    @property
+    def score_sum(self):
+        return int(self.histogram @ np.arange(len(self.histogram)))
+
+    @property
+    def class_average(self):
+        return self.score_sum / self.count if self.count else float("nan")
+
+    @property
+    def difficulty(self):
+        if not self.count:
+            return np.full(len(self.correct_counts), np.nan)
+        return self.correct_counts / self.count
@@ -0,0 +1,302 @@
+"""Rerun timing and figure cache statistics, for finding slow reruns.
+
+Lesson sections are timed with `timed` / `timed_section` and aggregated
+per process. The aggregates can be read in three ways:
+
+- the hidden admin panel, shown when the page is opened with
+  ?admin=<MATHCRAFT_ADMIN_CODE> (there is no panel if that isn't set)
+- a Prometheus text file per worker process, rewritten at most every few
+  seconds, when MATHCRAFT_METRICS_FILE is set (e.g. for node_exporter's
+  textfile collector): mathcraft.prom becomes mathcraft.<pid>.prom, with a
+  worker="<pid>" label on every sample
+- a Prometheus endpoint on MATHCRAFT_METRICS_PORT, bound to 127.0.0.1 unless
+  MATHCRAFT_METRICS_HOST says otherwise; with several workers only the one
+  that binds the port first serves it
+
+The admin panel can also switch on cProfile for the admin's own reruns,
+one rerun at a time per process. On Python 3.12+ cProfile is a process-wide
+sys.monitoring tool, so while it runs it also records (and slows) every
+other session's thread, and it can't start while another profiler, such as
+a debugger, is active.
+"""
+import atexit
+import contextlib
+import cProfile
+import functools
+import io
+import logging
+import os
+import pstats
+import secrets
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import streamlit as st
+
+import figures
+import svg_figures
+
+# Histogram buckets in seconds, from a cached figure up to a cold render
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+TEXTFILE_INTERVAL = 5.0
+PROFILE_LINES = 30
+
+log = logging.getLogger(__name__)
+
+
+class Timing:
+    """Count, sum, max and histogram of one section's durations."""
+
+    __slots__ = ("count", "total", "max", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * len(BUCKETS)
+
+    def observe(self, seconds):
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        for i, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                self.buckets[i] += 1
+                break
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+
+class Metrics:
+    """Section timings shared by every session in this process."""
+
+    def __init__(self):
+        self.timings = {}
+        self._lock = threading.Lock()
+
+    def observe(self, section, seconds):
+        with self._lock:
+            timing = self.timings.get(section)
+            if timing is None:
+                timing = self.timings[section] = Timing()
+            timing.observe(seconds)
+
+    def snapshot(self):
+        with self._lock:
+            return {section: (t.count, t.total, t.max, list(t.buckets)) for section, t in self.timings.items()}
+
+    def clear(self):
+        with self._lock:
+            self.timings.clear()
+
+
+metrics = Metrics()
+
+
+@contextlib.contextmanager
+def timed_section(section):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.observe(section, time.perf_counter() - start)
+
+
+def timed(section):
+    """Decorator timing every call of a section function (or fragment)."""
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with timed_section(section):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def figure_stats():
+    """{figure_id: (rendered, atlas hits)} plus PNG LRU, shared and SVG cache counters."""
+    with figures._stats_lock:
+        per_figure = {figure_id: (figures.render_counts[figure_id], figures.atlas_hits[figure_id])
+                      for figure_id in figures.FIGURE_BUILDERS}
+    svg_info = [builder.cache_info() for builder in svg_figures.SVG_BUILDERS.values()]
+    caches = {
+        "png": (figures.render_cache.hits, figures.render_cache.misses),
+        "svg": (sum(info.hits for info in svg_info), sum(info.misses for info in svg_info)),
+    }
+    if figures._shared is not None:
+        caches["shared"] = (figures._shared.hits, figures._shared.misses)
+    return per_figure, caches
+
+
+def prometheus_text(worker=None):
+    """All metrics in the Prometheus text exposition format, with a worker
+    label on every sample if `worker` is given."""
+    lines = [
+        "# HELP mathcraft_section_seconds Time spent running each lesson section.",
+        "# TYPE mathcraft_section_seconds histogram",
+    ]
+    for section, (count, total, _, buckets) in sorted(metrics.snapshot().items()):
+        cumulative = 0
+        for bound, in_bucket in zip(BUCKETS, buckets):
+            cumulative += in_bucket
+            lines.append(f'mathcraft_section_seconds_bucket{{section="{section}",le="{bound}"}} {cumulative}')
+        lines.append(f'mathcraft_section_seconds_bucket{{section="{section}",le="+Inf"}} {count}')
+        lines.append(f'mathcraft_section_seconds_sum{{section="{section}"}} {total:.6f}')
+        lines.append(f'mathcraft_section_seconds_count{{section="{section}"}} {count}')
+
+    per_figure, caches = figure_stats()
+    lines += [
+        "# HELP mathcraft_figure_renders_total Figures drawn with matplotlib.",
+        "# TYPE mathcraft_figure_renders_total counter",
+        *(f'mathcraft_figure_renders_total{{figure="{f}"}} {rendered}' for f, (rendered, _) in per_figure.items()),
+        "# HELP mathcraft_figure_atlas_hits_total Figures served from the precomputed atlas.",
+        "# TYPE mathcraft_figure_atlas_hits_total counter",
+        *(f'mathcraft_figure_atlas_hits_total{{figure="{f}"}} {hits}' for f, (_, hits) in per_figure.items()),
+        "# HELP mathcraft_figure_cache_hits_total Figure cache hits by cache.",
+        "# TYPE mathcraft_figure_cache_hits_total counter",
+        *(f'mathcraft_figure_cache_hits_total{{cache="{c}"}} {hits}' for c, (hits, _) in caches.items()),
+        "# HELP mathcraft_figure_cache_misses_total Figure cache misses by cache.",
+        "# TYPE mathcraft_figure_cache_misses_total counter",
+        *(f'mathcraft_figure_cache_misses_total{{cache="{c}"}} {misses}' for c, (_, misses) in caches.items()),
+    ]
+    if worker is not None:
+        lines = [line if line.startswith("#") else line.replace("{", f'{{worker="{worker}",', 1) for line in lines]
+    return "\n".join(lines) + "\n"
+
+
+_last_write = [0.0]
+
+
+def textfile_path(path, pid=None):
+    """This process's file for MATHCRAFT_METRICS_FILE: mathcraft.prom -> mathcraft.<pid>.prom."""
+    root, extension = os.path.splitext(path)
+    return f"{root}.{os.getpid() if pid is None else pid}{extension}"
+
+
+def write_textfile(path, force=False):
+    """Atomically rewrite this process's file for `path`, at most every
+    TEXTFILE_INTERVAL seconds. Workers each write their own file, since
+    sharing one would keep only the last writer's counters."""
+    now = time.monotonic()
+    if not force and now - _last_write[0] < TEXTFILE_INTERVAL:
+        return
+    first_write = not _last_write[0]
+    _last_write[0] = now
+    pid = os.getpid()
+    own_path = textfile_path(path, pid)
+    tmp_path = f"{own_path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(prometheus_text(worker=pid))
+    os.replace(tmp_path, own_path)
+    if first_write:
+        # A stopped worker's counters shouldn't be scraped forever
+        atexit.register(_remove, own_path)
+
+
+def _remove(path):
+    with contextlib.suppress(FileNotFoundError):
+        os.remove(path)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = prometheus_text().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(port, host="127.0.0.1"):
+    """Serve /metrics on `port` from a daemon thread; returns the server, or
+    None if the port can't be bound (e.g. another worker already has it)."""
+    try:
+        server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    except OSError as exc:
+        log.warning("Not serving metrics on %s:%s: %s", host, port, exc)
+        return None
+    threading.Thread(target=server.serve_forever, name="mathcraft-metrics", daemon=True).start()
+    return server
+
+
+# Only one cProfile can be active at a time; on Python 3.12+ it is process-wide
+_profiler_lock = threading.Lock()
+
+
+def _start_profiler():
+    """A running profiler, or None (with the reason in the report) if one can't start."""
+    if not _profiler_lock.acquire(blocking=False):
+        reason = "another admin's rerun is being profiled"
+    else:
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+            return profiler
+        except ValueError as exc:
+            # "Another profiling tool is already active", e.g. a debugger
+            _profiler_lock.release()
+            reason = str(exc)
+    st.session_state.admin_profile_report = f"Not profiled: {reason}."
+    return None
+
+
+@contextlib.contextmanager
+def profiled():
+    """Profile the body if this session switched profiling on in the admin panel.
+
+    On Python 3.12+ the profile includes whatever other sessions ran meanwhile.
+    """
+    profiler = _start_profiler() if st.session_state.get("admin_profile") else None
+    if profiler is None:
+        yield
+        return
+    try:
+        yield
+    finally:
+        profiler.disable()
+        _profiler_lock.release()
+        report = io.StringIO()
+        pstats.Stats(profiler, stream=report).sort_stats("cumulative").print_stats(PROFILE_LINES)
+        st.session_state.admin_profile_report = report.getvalue()
+
+
+def admin_requested():
+    code = os.environ.get("MATHCRAFT_ADMIN_CODE")
+    return bool(code) and secrets.compare_digest(st.query_params.get("admin", ""), code)
+
+
+def admin_panel():
+    """Timings, figure cache counters and the profiler toggle, in the sidebar."""
+    with st.sidebar:
+        st.markdown("### ⏱️ Rerun Timings")
+        rows = [
+            {"Section": section, "Runs": count, "Mean ms": 1000 * total / count, "Max ms": 1000 * worst}
+            for section, (count, total, worst, _) in sorted(metrics.snapshot().items())
+        ]
+        st.dataframe(rows, hide_index=True)
+
+        per_figure, caches = figure_stats()
+        st.markdown("**Figures**")
+        st.dataframe([{"Figure": f, "Rendered": rendered, "Atlas hits": hits}
+                      for f, (rendered, hits) in per_figure.items()], hide_index=True)
+        st.caption(" · ".join(f"{cache.upper()} cache: {hits} hits, {misses} misses"
+                              for cache, (hits, misses) in caches.items()))
+        if st.button("Reset timings"):
+            metrics.clear()
+
+        st.toggle("Profile my reruns (cProfile)", key="admin_profile",
+                  help="One rerun is profiled at a time. On Python 3.12+ cProfile covers the whole process, "
+                       "so other sessions' work during your rerun shows up too (and runs slower).")
+        if st.session_state.get("admin_profile_report"):
+            st.code(st.session_state.admin_profile_report, language="text")
+        st.download_button("Prometheus metrics", prometheus_text(), file_name="mathcraft.prom", mime="text/plain")
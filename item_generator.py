@@ -0,0 +1,106 @@
+"""Procedurally generated practice items for the notation in Sections 1-3.
+
+Items are generated a whole batch at a time with NumPy from a seed, so the
+same seed always gives the same items and a pool of thousands costs a few
+milliseconds. Each item evaluates one of
+
+    kx     "If x = 6, what is 4x?"
+    n/d    "If n = 24, what is n/8?"
+    kx/d   "If y = 6, what is 5y/3?"
+
+and comes with three distractors built from common misreadings of the
+notation (adding instead of multiplying, forgetting to divide, ...).
+"""
+import numpy as np
+
+from notation import compile_expression
+from question_bank import Question
+
+FORMS = ("kx", "n/d", "kx/d")
+VARIABLES = np.array(list("abmnxy"))
+OPTIONS = 4
+
+
+class ItemBatch:
+    """A batch of generated items stored column-wise as NumPy arrays."""
+
+    def __init__(self, form, variable, coefficient, divisor, value, options, answer):
+        self.form = form                # index into FORMS
+        self.variable = variable        # letter used for the variable
+        self.coefficient = coefficient  # k (1 for the n/d form)
+        self.divisor = divisor          # d (1 for the kx form)
+        self.value = value              # the value substituted for the variable
+        self.options = options          # (items x OPTIONS) numeric choices
+        self.answer = answer            # index of the correct choice
+
+    def __len__(self):
+        return len(self.form)
+
+    def expression(self, i):
+        k, d, var = int(self.coefficient[i]), int(self.divisor[i]), str(self.variable[i])
+        return {"kx": f"{k}{var}", "n/d": f"{var}/{d}", "kx/d": f"{k}{var}/{d}"}[FORMS[self.form[i]]]
+
+    def prompt(self, i):
+        return f"If {self.variable[i]} = {self.value[i]}, what is {self.expression(i)}?"
+
+    def question(self, i, question_id=None, group="generated"):
+        """Item `i` as a Question, so it can be shown and graded like Q1-Q12."""
+        return Question(question_id or f"G{i}", group, i % 2, self.prompt(i),
+                        tuple(str(option) for option in self.options[i]), int(self.answer[i]),
+                        free_response=True)
+
+    def take(self, indices):
+        return ItemBatch(*(getattr(self, name)[indices] for name in
+                           ("form", "variable", "coefficient", "divisor", "value", "options", "answer")))
+
+
+def generate_items(count, seed=0, forms=FORMS):
+    """Generate `count` items deterministically from `seed`."""
+    rng = np.random.default_rng(seed)
+    form = rng.choice([FORMS.index(f) for f in forms], size=count)
+    variable = rng.choice(VARIABLES, size=count)
+    multiply = form != FORMS.index("n/d")
+    divide = form != FORMS.index("kx")
+
+    coefficient = np.where(multiply, rng.integers(2, 10, size=count), 1)
+    divisor = np.where(divide, rng.integers(2, 11, size=count), 1)
+    # The value is a multiple of the divisor, so every answer is a whole number
+    quotient = np.where(multiply, rng.integers(1, 11, size=count), rng.integers(1, 16, size=count))
+    value = np.where(divide, divisor * quotient, rng.integers(2, 21, size=count))
+    # Every form is kx/d with k or d set to 1, so one exact evaluation covers the batch
+    exact = compile_expression("kx/d").evaluate(k=coefficient, x=value, d=divisor)
+    answer_value = exact.numerator
+
+    k, d, v = coefficient, divisor, value
+    misreadings = np.select(
+        [form[:, None] == FORMS.index("kx"), form[:, None] == FORMS.index("n/d")],
+        [
+            np.stack([k + v, k * 10 + v, v, k * v + k], axis=1),      # added, concatenated, dropped k
+            np.stack([v * d, v - d, v + d, d], axis=1),               # multiplied, subtracted, added
+        ],
+        np.stack([k * v, v // d + k, k * v - d, k * v * d], axis=1),  # forgot to divide, divided then added
+    )
+    # Fallbacks near the answer in case misreadings collide or go negative
+    candidates = np.concatenate(
+        [misreadings, answer_value[:, None] + np.array([1, 2, -1, 3])], axis=1)
+
+    # Keep the first three candidates that are positive, differ from the
+    # answer and don't repeat an earlier candidate
+    same_as_earlier = np.triu(candidates[:, :, None] == candidates[:, None, :], k=1).any(axis=1)
+    invalid = (candidates <= 0) | (candidates == answer_value[:, None]) | same_as_earlier
+    picks = np.argsort(invalid, axis=1, kind="stable")[:, :OPTIONS - 1]
+    distractors = np.take_along_axis(candidates, picks, axis=1)
+
+    # Shuffle the answer in among the distractors
+    choices = np.concatenate([answer_value[:, None], distractors], axis=1)
+    order = np.argsort(rng.random((count, OPTIONS)), axis=1)
+    options = np.take_along_axis(choices, order, axis=1)
+    answer = np.argmin(order, axis=1)
+
+    return ItemBatch(form, variable, coefficient, divisor, value, options, answer)
+
+
+def worksheet(pool, seed, size=6):
+    """Pick `size` distinct items from `pool` for the student seeded by `seed`."""
+    rng = np.random.default_rng(seed)
+    return pool.take(rng.choice(len(pool), size=size, replace=False))
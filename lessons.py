@@ -0,0 +1,62 @@
+"""The MathCraft lesson catalogue.
+
+Lessons are modules with a render() function, plus optional TITLE and ICON
+strings. Besides the built-in lessons below, any installed distribution can
+add lessons under the "mathcraft.lessons" entry point group, e.g.
+
+    [project.entry-points."mathcraft.lessons"]
+    ratios = "mathcraft_ratios.lesson"
+
+Listing the catalogue only reads package metadata; a lesson's module (and
+everything it imports) is loaded the first time a student opens it, so
+startup time and memory don't grow with the number of lessons installed.
+"""
+import functools
+import importlib.metadata
+
+ENTRY_POINT_GROUP = "mathcraft.lessons"
+
+BUILTIN_LESSONS = {
+    "algebra-notation": "algebra_notation",
+}
+
+DEFAULT_LESSON = "algebra-notation"
+
+
+class LessonError(LookupError):
+    pass
+
+
+@functools.lru_cache(maxsize=None)
+def catalogue():
+    """Lesson name -> entry point, without importing any lesson."""
+    lessons = {
+        name: importlib.metadata.EntryPoint(name, value, ENTRY_POINT_GROUP)
+        for name, value in BUILTIN_LESSONS.items()
+    }
+    # Installed lessons come second so a package can't shadow a built-in one
+    for entry_point in importlib.metadata.entry_points(group=ENTRY_POINT_GROUP):
+        lessons.setdefault(entry_point.name, entry_point)
+    return lessons
+
+
+def title(name):
+    """Display title for the lesson selector, taken from the lesson's name
+    so the catalogue can be listed without importing anything."""
+    return name.replace("-", " ").replace("_", " ").title()
+
+
+def load(name):
+    """Import lesson `name` and return its module.
+
+    Imports are cached in sys.modules, so each lesson is only imported once
+    per process (and again after a code change, when Streamlit reloads it).
+    """
+    try:
+        entry_point = catalogue()[name]
+    except KeyError:
+        raise LessonError(f"no lesson named {name!r}") from None
+    lesson = entry_point.load()
+    if not callable(getattr(lesson, "render", None)):
+        raise LessonError(f"lesson {name!r} ({entry_point.value}) has no render() function")
+    return lesson
@@ -0,0 +1,361 @@
+"""Exact evaluation of the lesson's algebra notation.
+
+    >>> expression = compile_expression("5y/4")
+    >>> expression(y=3)
+    Fraction(15, 4)
+    >>> expression.evaluate(y=np.arange(1, 5)).numerator
+    array([ 5,  5, 15,  5])
+
+An expression is parsed once and compiled into NumPy operations on integer
+numerator/denominator arrays, so one call evaluates it for a whole array of
+variable values without ever rounding. Numbers may be decimals ("1.5" is
+exactly 3/2). Variables are single letters, and a number or letter written
+next to another multiplies it, binding tighter than · * / and ÷ ("3xy" is
+3 · x · y, "5y/4" is (5 · y) ÷ 4, "x/2y" is x ÷ (2 · y)).
+
+Two expressions are checked for equivalence by evaluating both at the same
+random points (see match()), which is how typed answers are graded.
+"""
+import functools
+import re
+from fractions import Fraction
+from typing import NamedTuple
+
+import numpy as np
+
+TOKEN = re.compile(r"\s*(?:(\d+(?:\.\d+)?)|([A-Za-z])|([-+*/()·÷×]))")
+MULTIPLY, DIVIDE = "*·×", "/÷"
+
+# Intermediate results wider than this fall back to Python integers
+INT64_BITS = 62
+
+# Limits on what students can type: the parser and the compiled expression
+# recurse once per level of nesting
+MAX_LENGTH = 100
+MAX_DEPTH = 20
+
+# Equivalence checks: points per check and the range variables are drawn from
+SAMPLE_POINTS = 16
+SAMPLE_RANGE = (2, 1000)
+SAMPLE_SEED = 6
+
+
+class NotationError(ValueError):
+    """Raised for notation the parser can't read."""
+
+
+class Rational(NamedTuple):
+    """Exact results in lowest terms with positive denominators: int64
+    arrays, or object arrays of Python ints when int64 could overflow."""
+    numerator: np.ndarray
+    denominator: np.ndarray
+
+    def is_integer(self):
+        return self.denominator == 1
+
+    def to_float(self):
+        return self.numerator / self.denominator
+
+    def fraction(self, index=()):
+        return Fraction(int(self.numerator[index]), int(self.denominator[index]))
+
+
+def _reduce(numerator, denominator):
+    if np.any(denominator == 0):
+        raise ZeroDivisionError("division by zero in notation")
+    sign = np.where(denominator < 0, -1, 1)
+    divisor = np.gcd(numerator, denominator)
+    return sign * numerator // divisor, sign * denominator // divisor
+
+
+def _add(a, b):
+    return _reduce(a[0] * b[1] + b[0] * a[1], a[1] * b[1])
+
+
+def _subtract(a, b):
+    return _reduce(a[0] * b[1] - b[0] * a[1], a[1] * b[1])
+
+
+def _multiply(a, b):
+    return _reduce(a[0] * b[0], a[1] * b[1])
+
+
+def _divide(a, b):
+    return _reduce(a[0] * b[1], a[1] * b[0])
+
+
+def _sum_bits(a, b):
+    return max(a[0] + b[1], b[0] + a[1]) + 1, a[1] + b[1]
+
+
+# Per operation: the function, and a bound on the bits of its unreduced result
+OPERATIONS = {
+    "+": (_add, _sum_bits),
+    "-": (_subtract, _sum_bits),
+    **dict.fromkeys(MULTIPLY, (_multiply, lambda a, b: (a[0] + b[0], a[1] + b[1]))),
+    **dict.fromkeys(DIVIDE, (_divide, lambda a, b: (a[0] + b[1], a[1] + b[0]))),
+}
+SYMBOLS = {"+": "+", "-": "-", **dict.fromkeys(MULTIPLY, "·"), **dict.fromkeys(DIVIDE, "÷")}
+
+
+class _Node(NamedTuple):
+    evaluate: object  # env -> (numerator, denominator)
+    text: str         # fully parenthesized, with explicit · and ÷
+    bits: object      # variables' (numerator, denominator) bits -> bound on the result's
+
+
+class _Parser:
+    """Recursive descent over tokens, building a _Node per subexpression.
+
+    expression := term (("+" | "-") term)*
+    term       := product (("·" | "*" | "/" | "÷") product)*
+    product    := unary unary*          (implicit multiplication)
+    unary      := "-" unary | atom
+    atom       := number | letter | "(" expression ")"
+    """
+
+    def __init__(self, source):
+        self.source = source
+        self.tokens = []
+        position = 0
+        source = source.rstrip()
+        if len(source) > MAX_LENGTH:
+            raise NotationError(f"expressions are limited to {MAX_LENGTH} characters")
+        while position < len(source):
+            match = TOKEN.match(source, position)
+            if not match:
+                raise NotationError(f"unexpected {source[position:].strip()[0]!r} in {self.source!r}")
+            number, letter, symbol = match.groups()
+            token = ("number", number) if number else ("letter", letter) if letter else ("symbol", symbol)
+            self.tokens.append(token)
+            position = match.end()
+        self.position = 0
+        self.depth = 0
+        self.variables = set()
+
+    def peek(self):
+        return self.tokens[self.position] if self.position < len(self.tokens) else (None, None)
+
+    def take(self):
+        token = self.peek()
+        self.position += 1
+        return token
+
+    def parse(self):
+        if not self.tokens:
+            raise NotationError("empty expression")
+        node = self.expression()
+        if self.position < len(self.tokens):
+            raise NotationError(f"unexpected {self.peek()[1]!r} in {self.source!r}")
+        return node
+
+    def _binary(self, operand, symbols):
+        node = operand()
+        while self.peek()[0] == "symbol" and self.peek()[1] in symbols:
+            symbol = self.take()[1]
+            node = self._combine(node, operand(), symbol)
+        return node
+
+    @staticmethod
+    def _combine(left, right, symbol):
+        operation, bits = OPERATIONS[symbol]
+        return _Node(lambda env: operation(left.evaluate(env), right.evaluate(env)),
+                     f"({left.text} {SYMBOLS[symbol]} {right.text})",
+                     lambda variable_bits: bits(left.bits(variable_bits), right.bits(variable_bits)))
+
+    def expression(self):
+        return self._binary(self.term, "+-")
+
+    def term(self):
+        return self._binary(self.product, MULTIPLY + DIVIDE)
+
+    def product(self):
+        node = self.unary()
+        while self.peek()[0] in ("number", "letter") or self.peek() == ("symbol", "("):
+            node = self._combine(node, self.unary(), "·")
+        return node
+
+    def nested(self, parse):
+        self.depth += 1
+        if self.depth > MAX_DEPTH:
+            raise NotationError(f"too deeply nested: {self.source!r}")
+        try:
+            return parse()
+        finally:
+            self.depth -= 1
+
+    def unary(self):
+        if self.peek() == ("symbol", "-"):
+            self.take()
+            operand = self.nested(self.unary)
+            return _Node(lambda env: _multiply((-1, 1), operand.evaluate(env)), f"-{operand.text}", operand.bits)
+        return self.atom()
+
+    def atom(self):
+        kind, value = self.take()
+        if kind == "number":
+            # Decimals are exact too: "1.5" is 3/2
+            constant = Fraction(value)
+            numerator, denominator = constant.numerator, constant.denominator
+            bits = (numerator.bit_length(), denominator.bit_length() if denominator != 1 else 0)
+            # In the evaluation's dtype, so wide constants become Python ints too
+            return _Node(lambda env: (np.array([numerator], dtype=env["dtype"]),
+                                      np.array([denominator], dtype=env["dtype"]) if denominator != 1 else 1),
+                         value, lambda variable_bits: bits)
+        if kind == "letter":
+            self.variables.add(value)
+            return _Node(lambda env: env[value], value, lambda variable_bits: variable_bits)
+        if (kind, value) == ("symbol", "("):
+            node = self.nested(self.expression)
+            if self.take() != ("symbol", ")"):
+                raise NotationError(f"missing ')' in {self.source!r}")
+            return node
+        raise NotationError(f"expected a number, letter or '(' in {self.source!r}")
+
+
+class Expression:
+    """A compiled piece of notation; call it or use evaluate() for arrays."""
+
+    def __init__(self, source):
+        parser = _Parser(source)
+        self._root = parser.parse()
+        self.source = source
+        self.variables = tuple(sorted(parser.variables))
+        # Operations are parenthesized; the outermost one needn't be: "(5 · y) ÷ 4"
+        self.explicit = self._root.text[1:-1] if self._root.text.startswith("(") else self._root.text
+
+    def __repr__(self):
+        return f"Expression({self.source!r})"
+
+    def evaluate(self, **values):
+        """Exact results for arrays (or scalars) of variable values, broadcast
+        together. Values are integers or Fractions; floats must be whole."""
+        missing = set(self.variables) - set(values)
+        if missing:
+            raise NotationError(f"no value for {', '.join(sorted(missing))} in {self.source!r}")
+        exact = {name: _exact(name, values[name]) for name in self.variables}
+        numerator_bits = max((_bits(n) for n, _ in exact.values()), default=0)
+        denominator_bits = max((_bits(d) if np.any(d != 1) else 0 for _, d in exact.values()), default=0)
+        dtype = np.int64 if max(self._root.bits((numerator_bits, denominator_bits))) <= INT64_BITS else object
+        # At least 1-d: NumPy turns 0-d object results back into scalars, which np.gcd can't take
+        env = {name: (np.atleast_1d(n.astype(dtype)), np.atleast_1d(d.astype(dtype))) for name, (n, d) in exact.items()}
+        env["dtype"] = dtype
+        numerator, denominator = self._root.evaluate(env)
+        shape = np.broadcast_shapes(*(np.shape(n) for n, _ in exact.values()))
+        full = np.broadcast_shapes(np.shape(numerator), np.shape(denominator), shape or (1,))
+        return Rational(np.broadcast_to(numerator, full).reshape(shape).copy(),
+                        np.broadcast_to(denominator, full).reshape(shape).copy())
+
+    def __call__(self, **values):
+        return self.evaluate(**values).fraction()
+
+
+def _exact(name, value):
+    """A variable's values as (numerator, denominator) arrays."""
+    array = np.asarray(value)
+    if array.dtype.kind in "iu":
+        return array, np.ones(array.shape, dtype=np.int64)
+    numerators, denominators = [], []
+    for item in array.flat:
+        if isinstance(item, (float, np.floating)) and not float(item).is_integer():
+            raise NotationError(f"{name} = {item} isn't exact; pass a Fraction instead")
+        try:
+            item = Fraction(item)
+        except (TypeError, ValueError):
+            raise NotationError(f"{name} = {item!r} isn't a number") from None
+        numerators.append(item.numerator)
+        denominators.append(item.denominator)
+    return (np.array(numerators, dtype=object).reshape(array.shape),
+            np.array(denominators, dtype=object).reshape(array.shape))
+
+
+def _bits(array):
+    return int(np.abs(np.atleast_1d(array)).max(initial=0)).bit_length()
+
+
+@functools.lru_cache(maxsize=256)
+def compile_expression(source):
+    return Expression(source)
+
+
+def mixed_number(value):
+    """A Fraction the way the lesson writes it: 13, 2/3 or 13 1/3."""
+    value = Fraction(value)
+    if value.denominator == 1:
+        return str(value.numerator)
+    whole, remainder = divmod(abs(value.numerator), value.denominator)
+    sign = "-" if value < 0 else ""
+    return f"{sign}{whole} {remainder}/{value.denominator}" if whole else f"{sign}{remainder}/{value.denominator}"
+
+
+@functools.lru_cache(maxsize=None)
+def _sample(variable, points=SAMPLE_POINTS):
+    """The values `variable` takes at each sample point; the same every time,
+    so a typed answer grades the same way on every check."""
+    return np.random.default_rng([SAMPLE_SEED, ord(variable)]).integers(*SAMPLE_RANGE, size=points)
+
+
+@functools.lru_cache(maxsize=1024)
+def _sample_values(source, points):
+    """(numerator, denominator) rows at the sample points, with denominator 0
+    where the expression is undefined; None if it doesn't parse.
+
+    Anything a student types comes through here, so this never raises.
+    """
+    try:
+        return _evaluate_samples(compile_expression(source), points)
+    except (NotationError, RecursionError, OverflowError):
+        return None
+
+
+def _evaluate_samples(expression, points):
+    values = {name: _sample(name, points) for name in expression.variables}
+    try:
+        result = expression.evaluate(**values)
+        # Constants ("24") come back as scalars
+        return np.broadcast_to(result.numerator, points), np.broadcast_to(result.denominator, points)
+    except ZeroDivisionError:
+        # Exact fallback: point by point, leaving out the points where it's undefined
+        numerator, denominator = np.zeros(points, dtype=object), np.zeros(points, dtype=object)
+        for point in range(points):
+            try:
+                value = expression(**{name: column[point] for name, column in values.items()})
+            except ZeroDivisionError:
+                continue
+            numerator[point], denominator[point] = value.numerator, value.denominator
+        return numerator, denominator
+
+
+def match(candidates, answers, points=SAMPLE_POINTS):
+    """For each answer, the index of the first candidate it is equivalent to, or -1.
+
+    Every distinct answer is evaluated once, exactly, at the same random
+    points as the candidates, and the comparison is one array operation per
+    candidate. Answers that don't parse match nothing; an answer has to agree
+    with a candidate wherever both are defined, on at least half the points.
+    """
+    answers = list(answers)
+    distinct = list(dict.fromkeys(answers))
+    sampled = [_sample_values(answer, points) for answer in distinct]
+    parsed = [i for i, values in enumerate(sampled) if values is not None]
+    matches = np.full(len(distinct), -1)
+    if parsed:
+        numerators = np.array([sampled[i][0] for i in parsed], dtype=object)
+        denominators = np.array([sampled[i][1] for i in parsed], dtype=object)
+        found = np.full(len(parsed), -1)
+        for index, candidate in enumerate(candidates):
+            expected = _sample_values(candidate, points)
+            if expected is None:
+                continue
+            defined = (denominators != 0) & (expected[1] != 0)
+            same = (numerators == expected[0]) & (denominators == expected[1])
+            equivalent = (same | ~defined).all(axis=1) & (2 * defined.sum(axis=1) >= points)
+            found = np.where((found == -1) & equivalent, index, found)
+        matches[parsed] = found
+    lookup = dict(zip(distinct, matches))
+    return np.array([lookup[answer] for answer in answers], dtype=np.int64)
+
+
+def equivalent(expected, answers, points=SAMPLE_POINTS):
+    """Whether each of `answers` means the same as `expected`."""
+    return match([expected], answers, points) == 0
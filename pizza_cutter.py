@@ -0,0 +1,111 @@
+"""The interactive pizza cutter, served as a static Streamlit component.
+
+The HTML, CSS and JS live in static/pizza_cutter/. Once per process they are
+copied into a build directory with content-hashed asset names, so browsers
+cache the assets until they actually change. The iframe stays loaded across
+reruns, which then only send it the lesson's divisor.
+
+The pepperoni layout is computed here with NumPy at build time and shipped
+as a Float32Array, so the browser only has to move slice lines.
+"""
+import atexit
+import functools
+import hashlib
+import os
+import shutil
+import string
+import tempfile
+
+import numpy as np
+import streamlit.components.v1 as components
+
+SOURCE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static", "pizza_cutter")
+ASSETS = {"css": "pizza_cutter.css", "js": "pizza_cutter.js"}
+
+# Pizza geometry, matching the SVG in index.html
+CENTER = 200
+RADIUS = 150
+
+# (distance from the center as a share of the radius, pieces) per ring,
+# placed like real pizza makers do: a few in the middle, most further out
+PEPPERONI_RINGS = [(0.2, 3), (0.45, 6), (0.7, 8), (0.85, 4)]
+SCATTERED_PEPPERONI = 4
+
+
+def _lcg(count, seed=42069):
+    """The seeded generator the cutter has always used, as an array."""
+    values = np.empty(count)
+    for i in range(count):
+        seed = (seed * 9301 + 49297) % 233280
+        values[i] = seed / 233280
+    return values
+
+
+def pepperoni_layout():
+    """(pieces x 3) array of x, y, radius for every pepperoni.
+
+    The layout doesn't depend on the number of slices: the slice lines
+    simply cut through wherever the pepperoni fall.
+    """
+    ring_radius = np.repeat([r for r, _ in PEPPERONI_RINGS], [n for _, n in PEPPERONI_RINGS])
+    base_angle = np.concatenate([np.arange(n) * (2 * np.pi / n) for _, n in PEPPERONI_RINGS])
+    ringed = len(ring_radius)
+    random = _lcg(3 * (ringed + SCATTERED_PEPPERONI))
+
+    # Three draws per ringed piece: angle jitter, distance jitter, size
+    angle_jitter, radius_jitter, size = random[:3 * ringed].reshape(-1, 3).T
+    angle = base_angle + (angle_jitter - 0.5) * 0.8
+    distance = np.minimum((ring_radius + (radius_jitter - 0.5) * 0.15) * RADIUS, RADIUS * 0.9)
+    ringed_pieces = np.column_stack([
+        CENTER + distance * np.cos(angle), CENTER + distance * np.sin(angle), 8 + size * 4])
+
+    # Three draws per scattered piece: angle, distance, size
+    angle, distance, size = random[3 * ringed:].reshape(-1, 3).T
+    angle, distance = angle * 2 * np.pi, distance * RADIUS * 0.8
+    scattered_pieces = np.column_stack([
+        CENTER + distance * np.cos(angle), CENTER + distance * np.sin(angle), 7 + size * 3])
+
+    return np.concatenate([ringed_pieces, scattered_pieces])
+
+
+def pepperoni_script():
+    """The layout as a script defining PEPPERONI = Float32Array[x, y, r, ...]."""
+    values = ",".join(f"{v:.2f}".rstrip("0").rstrip(".") for v in pepperoni_layout().ravel())
+    return f"const PEPPERONI = new Float32Array([{values}]);\n"
+
+
+def _write_hashed(out_dir, asset, data):
+    stem, ext = os.path.splitext(asset)
+    name = f"{stem}.{hashlib.sha256(data).hexdigest()[:12]}{ext}"
+    with open(os.path.join(out_dir, name), "wb") as f:
+        f.write(data)
+    return name
+
+
+def build(out_dir):
+    """Write index.html and the hashed assets into `out_dir`."""
+    names = {"pepperoni": _write_hashed(out_dir, "pepperoni.js", pepperoni_script().encode())}
+    for kind, asset in ASSETS.items():
+        with open(os.path.join(SOURCE_DIR, asset), "rb") as f:
+            names[kind] = _write_hashed(out_dir, asset, f.read())
+
+    with open(os.path.join(SOURCE_DIR, "index.html"), encoding="utf-8") as f:
+        index = string.Template(f.read()).substitute(names)
+    with open(os.path.join(out_dir, "index.html"), "w", encoding="utf-8") as f:
+        f.write(index)
+    return names
+
+
+@functools.lru_cache(maxsize=None)
+def build_dir():
+    out_dir = tempfile.mkdtemp(prefix="mathcraft-pizza-cutter-")
+    atexit.register(shutil.rmtree, out_dir, ignore_errors=True)
+    build(out_dir)
+    return out_dir
+
+
+def pizza_cutter(divisor, key="pizza_cutter"):
+    """Show the pizza cutter, starting from `divisor` slices."""
+    # Declared on every call: registration needs a running script context
+    component = components.declare_component("pizza_cutter", path=build_dir())
+    return component(divisor=divisor, key=key, default=None)
@@ -0,0 +1,116 @@
+"""The practice and analytical questions, loaded once from questions.json.
+
+Answers are handled as small integer option indices everywhere: widget
+state, stored submissions and grading. Option text is only looked up for
+display and exports. Free-response questions can also be answered by typing
+an expression; a typed answer is graded as the option it is equivalent to.
+Only questions that ask for a value are free-response: for "what does 5x
+mean?", typing the prompt back would be equivalent to the answer.
+"""
+import functools
+import json
+import os
+from typing import NamedTuple
+
+import numpy as np
+
+import notation
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "questions.json")
+
+UNANSWERED = -1
+
+
+class Question(NamedTuple):
+    id: str
+    group: str
+    column: int
+    prompt: str
+    options: tuple
+    answer: int
+    free_response: bool = False
+
+    @property
+    def key(self):
+        """Widget key, e.g. "q1"."""
+        return self.id.lower()
+
+    def encode(self, values):
+        """Option indices for answers to this question.
+
+        Each answer may be an option index, option text (as in older
+        submissions) or, for free-response questions, a typed expression,
+        which is matched against every option in one batch. Anything else
+        is UNANSWERED.
+        """
+        option_index = {text: i for i, text in enumerate(self.options)}
+        codes = np.full(len(values), UNANSWERED, dtype=np.int8)
+        typed = []
+        for i, value in enumerate(values):
+            if isinstance(value, (float, np.floating)) and float(value).is_integer():
+                value = int(value)  # pandas turns int columns with gaps into floats
+            if isinstance(value, (int, np.integer)) and 0 <= value < len(self.options):
+                codes[i] = value
+            elif isinstance(value, str):
+                codes[i] = option_index.get(value, UNANSWERED)
+                if codes[i] == UNANSWERED and self.free_response and value.strip():
+                    typed.append(i)
+        if typed:
+            codes[typed] = notation.match(self.options, [values[i] for i in typed])
+        return codes
+
+
+class AnalyticalQuestion(NamedTuple):
+    id: str
+    prompt: str
+    placeholder: str
+
+    @property
+    def key(self):
+        """Widget key, e.g. "analytical1"."""
+        return self.id.lower().replace("_", "")
+
+
+class QuestionBank:
+    """Questions indexed by id, with the answer key as an integer array."""
+
+    def __init__(self, questions, analytical=()):
+        self.questions = tuple(questions)
+        self.analytical = tuple(analytical)
+        self.ids = [q.id for q in self.questions]
+        self.by_id = {q.id: q for q in self.questions}
+        self.answer_key = np.array([q.answer for q in self.questions], dtype=np.int8)
+
+    def __len__(self):
+        return len(self.questions)
+
+    def group(self, name):
+        return [q for q in self.questions if q.group == name]
+
+    def encode(self, question_id, value):
+        """Option index for one answer; see Question.encode."""
+        return int(self.by_id[question_id].encode([value])[0])
+
+    def encode_answers(self, responses):
+        """One student's responses dict as a row of option indices."""
+        return np.array([self.encode(qid, responses.get(qid)) for qid in self.ids], dtype=np.int8)
+
+    def decode(self, question_id, value):
+        """Option text for a stored answer; None if it was left unanswered."""
+        if value == UNANSWERED:
+            return None
+        if isinstance(value, int) and 0 <= value < len(self.by_id[question_id].options):
+            return self.by_id[question_id].options[value]
+        return value
+
+
+@functools.lru_cache(maxsize=None)
+def load_bank(path=DEFAULT_PATH):
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    return QuestionBank(
+        (Question(q["id"], q["group"], q["column"], q["prompt"], tuple(q["options"]), q["answer"],
+                  q.get("free_response", False))
+         for q in data["questions"]),
+        (AnalyticalQuestion(q["id"], q["prompt"], q["placeholder"]) for q in data.get("analytical", ())),
+    )
@@ -0,0 +1,265 @@
+"""Text analytics over the analytical-thinking reflections.
+
+Reflections are indexed as they arrive: update() reads only submissions the
+index hasn't seen, so old essays are never re-read or re-tokenized. Each
+answer is one document, kept as rows of (document, term, count) arrays, and
+a report for any question, class and date is a few NumPy operations on
+them: TF-IDF vectors, spherical k-means to group similar answers, and a
+count of the answers that mention each of the lesson's key concepts.
+Reports are cached until new reflections arrive.
+
+It needs only NumPy and a submission store, so it also runs offline:
+
+    python reflections.py [--store URL] [--question Analytical_1] [--class-name ...] [--clusters 4]
+"""
+import argparse
+import os
+import re
+import sys
+import threading
+from array import array
+from collections import Counter
+from typing import NamedTuple
+
+import numpy as np
+
+from grading import BANK
+from submissions import DEFAULT_URL, open_store
+
+WORD = re.compile(r"[a-z0-9]+(?:['’][a-z]+)?")
+STOPWORDS = frozenset("""
+    a about all also am an and are as at be been but by can could did do does doing for from get got had has
+    have how i if in into is it its just me my of on or our so some than that the their them there these they
+    this those to too us was we were what when where which who why will with would you your i'm it's that's
+""".split())
+
+# Word families that matter in this lesson, folded to one term
+FAMILIES = {
+    "multiplication": "multiply", "multiplying": "multiply", "multiplied": "multiply", "times": "multiply",
+    "division": "divide", "dividing": "divide", "divided": "divide",
+    "sharing": "share", "shared": "share", "grouping": "group",
+    "equally": "equal", "evenly": "even",
+}
+
+# Key ideas the lesson is after, as phrases of terms. Stopwords are dropped
+# and word families folded first, so "you multiply it first" has "multiply first".
+CONCEPTS = {
+    "groups": ("group",),
+    "multiply first": ("multiply first", "first multiply", "multiply then divide", "multiply before"),
+    "equal sharing": ("share", "split", "equal part", "divide equal", "divide even"),
+    "fraction bar": ("fraction",),
+    "order of operations": ("order operation", "pemdas"),
+    "shorthand": ("shorthand", "shortcut", "short way", "shorter", "skip"),
+}
+
+MAX_CLUSTERS = 6
+EXAMPLES = 3
+KMEANS_ITERATIONS = 20
+
+
+def term(word):
+    """The index term for a lowercase word: its word family, with plurals folded."""
+    word = FAMILIES.get(word, word)
+    if len(word) > 4 and word.endswith("ies"):
+        return word[:-3] + "y"
+    if len(word) > 3 and word.endswith("s") and not word.endswith(("ss", "us", "is")):
+        return FAMILIES.get(word[:-1], word[:-1])
+    return word
+
+
+def words(text):
+    """(word, term) pairs for the words of `text` that aren't stopwords."""
+    return [(word, term(word)) for word in WORD.findall(text.lower().replace("’", "'")) if word not in STOPWORDS]
+
+
+CONCEPT_PHRASES = {concept: [tuple(t for _, t in words(phrase)) for phrase in phrases]
+                   for concept, phrases in CONCEPTS.items()}
+LONGEST_PHRASE = max(len(phrase) for phrases in CONCEPT_PHRASES.values() for phrase in phrases)
+
+
+def concept_mask(terms):
+    """Bitmask over CONCEPTS of the concepts mentioned in a list of terms."""
+    grams = {tuple(terms[i:i + n]) for n in range(1, LONGEST_PHRASE + 1) for i in range(len(terms) - n + 1)}
+    return sum(1 << bit for bit, phrases in enumerate(CONCEPT_PHRASES.values())
+               if any(phrase in grams for phrase in phrases))
+
+
+class Cluster(NamedTuple):
+    terms: tuple      # the words that weigh most in the cluster's center
+    size: int
+    examples: list    # (name, answer) for the answers nearest the center
+
+
+class ReflectionReport(NamedTuple):
+    answers: int
+    concepts: dict    # concept -> answers mentioning it
+    clusters: list    # largest first
+    flagged: list     # (name, class, answer, concepts) per answer
+
+
+def spherical_kmeans(matrix, k, iterations=KMEANS_ITERATIONS, seed=0):
+    """Cluster L2-normalized rows by cosine similarity; returns (labels, centers)."""
+    rng = np.random.default_rng(seed)
+    # k-means++ seeding: each new center is drawn away from the ones so far
+    chosen = [int(rng.integers(len(matrix)))]
+    while len(chosen) < k:
+        distance = np.clip(1 - (matrix @ matrix[chosen].T).max(axis=1), 0, None)
+        if not distance.sum():
+            break
+        chosen.append(int(rng.choice(len(matrix), p=distance / distance.sum())))
+    centers = matrix[chosen].copy()
+    labels = None
+    for _ in range(iterations):
+        nearest = np.argmax(matrix @ centers.T, axis=1)
+        if labels is not None and np.array_equal(nearest, labels):
+            break
+        labels = nearest
+        sums = np.zeros_like(centers)
+        np.add.at(sums, labels, matrix)
+        norms = np.linalg.norm(sums, axis=1)
+        centers[norms > 0] = sums[norms > 0] / norms[norms > 0, None]
+    return labels, centers
+
+
+class ReflectionIndex:
+    """Every reflection answer, indexed incrementally; shared by dashboard sessions."""
+
+    def __init__(self):
+        self.cursor = 0             # id of the last submission indexed
+        self.terms = {}             # term -> term id
+        self.spelling = []          # per term: the first word seen for it, for display
+        self.documents = []         # per document: (name, class name, submitted on, answer)
+        self.question = array("b")  # per document: index into BANK.analytical
+        self.concepts = array("H")  # per document: bitmask over CONCEPTS
+        # One row per (document, term) pair
+        self.row_document = array("I")
+        self.row_term = array("I")
+        self.row_count = array("H")
+        self._reports = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.documents)
+
+    def update(self, store):
+        """Index everything submitted to `store` since the last update."""
+        with self._lock:
+            before = len(self.documents)
+            for chunk in store.iter_since(self.cursor):
+                for submission_id, submission in chunk:
+                    self._add(submission)
+                    self.cursor = submission_id
+            if len(self.documents) > before:
+                self._reports.clear()
+            return len(self.documents) - before
+
+    def _add(self, submission):
+        responses = submission["responses"]
+        for question_index, question in enumerate(BANK.analytical):
+            answer = responses.get(question.id)
+            if not isinstance(answer, str) or not answer.strip():
+                continue
+            document = len(self.documents)
+            pairs = words(answer)
+            for word, t in pairs:
+                if t not in self.terms:
+                    self.terms[t] = len(self.spelling)
+                    self.spelling.append(word)
+            for t, count in Counter(t for _, t in pairs).items():
+                self.row_document.append(document)
+                self.row_term.append(self.terms[t])
+                self.row_count.append(min(count, 0xFFFF))
+            self.documents.append((submission["name"], submission["class_name"], submission["submitted_on"], answer))
+            self.question.append(question_index)
+            self.concepts.append(concept_mask([t for _, t in pairs]))
+
+    def _select(self, question_id, class_name, submitted_on):
+        selected = np.ones(len(self.documents), dtype=bool)
+        if question_id is not None:
+            index = [q.id for q in BANK.analytical].index(question_id)
+            selected &= np.frombuffer(self.question, dtype=np.int8) == index
+        if class_name is not None or submitted_on is not None:
+            selected &= [(class_name is None or cls == class_name) and (submitted_on is None or on == submitted_on)
+                         for _, cls, on, _ in self.documents]
+        return np.flatnonzero(selected)
+
+    def tfidf(self, documents):
+        """L2-normalized TF-IDF rows for `documents`, and the term id of each column."""
+        position = np.full(len(self.documents), -1)
+        position[documents] = np.arange(len(documents))
+        rows = position[np.frombuffer(self.row_document, dtype=np.uint32)]
+        keep = rows >= 0
+        used, columns = np.unique(np.frombuffer(self.row_term, dtype=np.uint32)[keep], return_inverse=True)
+        matrix = np.zeros((len(documents), len(used)))
+        matrix[rows[keep], columns] = 1 + np.log(np.frombuffer(self.row_count, dtype=np.uint16)[keep])
+        document_frequency = np.bincount(columns, minlength=len(used))
+        matrix *= np.log((1 + len(documents)) / (1 + document_frequency)) + 1
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        return matrix / np.where(norms == 0, 1, norms), used
+
+    def report(self, question_id=None, class_name=None, submitted_on=None, clusters=None):
+        """Concept counts and clusters for the matching answers."""
+        key = (question_id, class_name, submitted_on, clusters)
+        with self._lock:
+            if key not in self._reports:
+                self._reports[key] = self._report(self._select(question_id, class_name, submitted_on), clusters)
+            return self._reports[key]
+
+    def _report(self, documents, clusters):
+        masks = np.frombuffer(self.concepts, dtype=np.uint16)[documents]
+        mentions = (masks[:, None] >> np.arange(len(CONCEPTS))) & 1
+        concepts = dict(zip(CONCEPTS, mentions.sum(axis=0).tolist()))
+        flagged = [(*self.documents[d][:2], self.documents[d][3],
+                    ", ".join(c for c, hit in zip(CONCEPTS, row) if hit)) for d, row in zip(documents, mentions)]
+
+        matrix, used = self.tfidf(documents)
+        # Answers with no indexed words (all stopwords) can't be compared
+        words_present = matrix.any(axis=1)
+        matrix, documents = matrix[words_present], documents[words_present]
+        groups = []
+        if len(documents):
+            k = min(clusters or MAX_CLUSTERS, max(1, round((len(documents) / 2) ** 0.5)), len(documents))
+            labels, centers = spherical_kmeans(matrix, k)
+            similarity = matrix @ centers.T
+            for cluster, center in enumerate(centers):
+                members = np.flatnonzero(labels == cluster)
+                if not len(members):
+                    continue
+                top_terms = used[np.argsort(center)[::-1][:3]]
+                nearest = members[np.argsort(similarity[members, cluster])[::-1][:EXAMPLES]]
+                groups.append(Cluster(tuple(self.spelling[t] for t in top_terms), len(members),
+                                      [(self.documents[d][0], self.documents[d][3]) for d in documents[nearest]]))
+            groups.sort(key=lambda cluster: -cluster.size)
+        return ReflectionReport(len(flagged), concepts, groups, flagged)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--store", default=os.environ.get("MATHCRAFT_SUBMISSIONS", DEFAULT_URL))
+    parser.add_argument("--question", choices=[q.id for q in BANK.analytical], default=None,
+                        help="one analytical question (default: each in turn)")
+    parser.add_argument("--class-name", default=None)
+    parser.add_argument("--date", default=None, help="submitted on, as YYYY-MM-DD")
+    parser.add_argument("--clusters", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    index = ReflectionIndex()
+    index.update(open_store(args.store))
+    for question in BANK.analytical:
+        if args.question not in (None, question.id):
+            continue
+        report = index.report(question.id, args.class_name, args.date, args.clusters)
+        print(f"{question.id}: {question.prompt} ({report.answers} answers)")
+        if not report.answers:
+            continue
+        print("  concepts: " + ", ".join(f"{concept}={count} ({count / report.answers:.0%})"
+                                         for concept, count in report.concepts.items()))
+        for cluster in report.clusters:
+            print(f"  [{cluster.size}] {', '.join(cluster.terms)}")
+            for name, answer in cluster.examples:
+                print(f"      {name}: {answer[:100]}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
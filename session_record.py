@@ -0,0 +1,56 @@
+"""A student's lesson state, kept small so one worker can hold many sessions.
+
+Streamlit already keeps every widget's value in session state, so the record
+doesn't copy any of it that it doesn't need: answers are option indices in a
+12-byte signed array, the student's details are interned (a class of thirty
+shares one "Period 3"), and the analytical answers are only read from their
+text areas when the work is submitted and go straight to the submission store.
+"""
+import sys
+from array import array
+
+import numpy as np
+
+from grading import BANK, correctness
+from question_bank import UNANSWERED
+
+ANALYTICAL_KEYS = [question.key for question in BANK.analytical]
+
+
+class SessionRecord:
+    __slots__ = ("name", "date", "class_name", "answers", "submissions")
+
+    def __init__(self):
+        self.name = self.date = self.class_name = ""
+        self.answers = array("b", [UNANSWERED] * len(BANK))
+        self.submissions = 0
+
+    def set_student(self, name, date, class_name):
+        self.name, self.date, self.class_name = (sys.intern(value) for value in (name, date, class_name))
+
+    def set_answers(self, values):
+        """Option index per question, in question bank order."""
+        self.answers = array("b", (BANK.encode(qid, value) for qid, value in zip(BANK.ids, values)))
+
+    @property
+    def complete(self):
+        return bool(self.name and self.date)
+
+    def score(self):
+        return int(correctness(np.frombuffer(self.answers, dtype=np.int8)).sum())
+
+    def responses(self, analytical=(), typed=None):
+        """The responses dict submissions are built from.
+
+        `typed` maps question ids to answers typed in free-response mode,
+        which are stored as typed rather than as the option they matched;
+        "Typed" lists those question ids, so a typed "24" can be told apart
+        from the option "24".
+        """
+        typed = typed or {}
+        responses = {"Name": self.name, "Date": self.date}
+        responses.update(zip(BANK.ids, self.answers))
+        responses.update(typed)
+        responses["Typed"] = ",".join(typed)
+        responses.update(zip((question.id for question in BANK.analytical), analytical))
+        return responses
@@ -0,0 +1,163 @@
+"""Figure renders shared by every worker process on one machine.
+
+Several Streamlit workers behind a load balancer each keep their own LRU in
+figures.py; this cache sits behind those LRUs so that a figure rendered by
+one worker is served to all the others without rendering it again. It is a
+single memory-mapped file, ideally on tmpfs (/dev/shm), so the pages are
+shared by every process that maps it:
+
+    header | slot table | data ring
+
+Slots are an open-addressing hash table from a key digest to the offset of
+a record in the ring. Records are written at the ring's head and wrap
+around at the end, overwriting the oldest renders, so the file never grows
+past its size. Writers take an flock on the file; readers take no lock at
+all and instead check each record's digest, length and CRC, treating a
+record that was overwritten or half-written as a miss.
+
+Digests include atlas.fingerprint(), so workers running different code
+(during a rolling deploy, say) never serve each other's figures.
+
+    MATHCRAFT_SHARED_CACHE=/dev/shm/mathcraft-figures MATHCRAFT_SHARED_CACHE_MB=64
+"""
+import contextlib
+import fcntl
+import hashlib
+import mmap
+import os
+import struct
+import threading
+import zlib
+
+import atlas
+import figures
+
+MAGIC = b"MCFIG001"
+HEADER = struct.Struct("<8sQQ")   # magic, slot count, ring head
+SLOT = struct.Struct("<16sQI4x")  # key digest, record offset, data length
+RECORD = struct.Struct("<16sII")  # key digest, data length, CRC-32 of the data
+HEADER_SIZE = 64
+EMPTY = bytes(16)
+PROBES = 8
+ALIGNMENT = 8
+
+DEFAULT_SIZE_MB = 64
+# Renders are 10-20 KB, so this leaves the slot table mostly empty
+BYTES_PER_SLOT = 4096
+
+
+class SharedRenderCache:
+    """A size-bounded figure cache in a file mapped by every worker process."""
+
+    def __init__(self, path, size=DEFAULT_SIZE_MB * 2**20, version=""):
+        self.path = path
+        self.version = version.encode()
+        self.hits = 0
+        self.misses = 0
+        self._thread_lock = threading.Lock()
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        with self._locked():
+            header = os.pread(self._fd, HEADER.size, 0)
+            if header[:8] == MAGIC:
+                # Another worker laid it out already. Keep its size: resizing
+                # a file other processes have mapped would crash them.
+                self.slots = HEADER.unpack(header)[1]
+                self.size = os.fstat(self._fd).st_size
+            else:
+                self.slots = max(256, size // BYTES_PER_SLOT)
+                self.size = max(size, HEADER_SIZE + self.slots * SLOT.size + 2**20)
+                os.ftruncate(self._fd, 0)
+                os.ftruncate(self._fd, self.size)
+                os.pwrite(self._fd, HEADER.pack(MAGIC, self.slots, HEADER_SIZE + self.slots * SLOT.size), 0)
+        self.data_start = HEADER_SIZE + self.slots * SLOT.size
+        self._map = mmap.mmap(self._fd, self.size)
+
+    @contextlib.contextmanager
+    def _locked(self):
+        # flock alone doesn't exclude other threads sharing the descriptor
+        with self._thread_lock:
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def digest(self, key):
+        return hashlib.blake2b(self.version + repr(key).encode(), digest_size=16).digest()
+
+    def _probes(self, digest):
+        first = int.from_bytes(digest[:8], "little") % self.slots
+        for probe in range(PROBES):
+            yield HEADER_SIZE + (first + probe) % self.slots * SLOT.size
+
+    def _record(self, digest, offset, length):
+        """The data stored for `digest` at `offset`, or None if it was overwritten."""
+        end = offset + RECORD.size + length
+        if offset < self.data_start or end > self.size:
+            return None
+        stored_digest, stored_length, crc = RECORD.unpack_from(self._map, offset)
+        if stored_digest != digest or stored_length != length:
+            return None
+        data = self._map[offset + RECORD.size:end]
+        return data if zlib.crc32(data) == crc else None
+
+    def get(self, key):
+        digest = self.digest(key)
+        data = None
+        for slot in self._probes(digest):
+            slot_digest, offset, length = SLOT.unpack_from(self._map, slot)
+            if slot_digest == digest:
+                data = self._record(digest, offset, length)
+                break
+            if slot_digest == EMPTY:
+                break
+        if data is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return data
+
+    def put(self, key, data):
+        digest = self.digest(key)
+        needed = -(-(RECORD.size + len(data)) // ALIGNMENT) * ALIGNMENT
+        if needed > self.size - self.data_start:
+            return
+        with self._locked():
+            head = HEADER.unpack_from(self._map, 0)[2]
+            if head + needed > self.size:
+                head = self.data_start
+            # Data first and the record header last, so readers never match a half-written record
+            self._map[head + RECORD.size:head + RECORD.size + len(data)] = data
+            RECORD.pack_into(self._map, head, digest, len(data), zlib.crc32(data))
+            SLOT.pack_into(self._map, self._free_slot(digest), digest, head, len(data))
+            HEADER.pack_into(self._map, 0, MAGIC, self.slots, head + needed)
+
+    def _free_slot(self, digest):
+        """The slot to write `digest` to: its own, an empty or stale one, or else the first probed."""
+        probes = list(self._probes(digest))
+        for slot in probes:
+            slot_digest, offset, length = SLOT.unpack_from(self._map, slot)
+            if slot_digest in (digest, EMPTY):
+                return slot
+        for slot in probes:
+            slot_digest, offset, length = SLOT.unpack_from(self._map, slot)
+            if self._record(slot_digest, offset, length) is None:
+                return slot
+        return probes[0]
+
+    def clear(self):
+        with self._locked():
+            self._map[HEADER_SIZE:self.data_start] = bytes(self.data_start - HEADER_SIZE)
+            HEADER.pack_into(self._map, 0, MAGIC, self.slots, self.data_start)
+            self.hits = self.misses = 0
+
+    def close(self):
+        self._map.close()
+        os.close(self._fd)
+
+
+def install(path, size_mb=DEFAULT_SIZE_MB):
+    """Open the shared cache at `path` and have figures.render_image use it."""
+    cache = SharedRenderCache(path, size_mb * 2**20, atlas.fingerprint())
+    figures.install_shared_cache(cache)
+    return cache
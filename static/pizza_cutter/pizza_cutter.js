@@ -0,0 +1,106 @@
+const slider = document.getElementById('sliceSlider');
+const sliceValue = document.getElementById('sliceValue');
+const sliceCount = document.getElementById('sliceCount');
+const fractionDisplay = document.getElementById('fractionDisplay');
+const mathExplanation = document.getElementById('mathExplanation');
+const pizzaSvg = document.getElementById('pizzaSvg');
+
+const centerX = 200;
+const centerY = 200;
+const radius = 150;
+
+// Pepperoni layout precomputed in Python (pepperoni.js): x, y, r per piece.
+// It's the same for every slice count, so it is drawn once.
+function drawPepperoni() {
+    for (let i = 0; i < PEPPERONI.length; i += 3) {
+        const pepperoni = document.createElementNS('http://www.w3.org/2000/svg', 'circle');
+        pepperoni.setAttribute('cx', PEPPERONI[i]);
+        pepperoni.setAttribute('cy', PEPPERONI[i + 1]);
+        pepperoni.setAttribute('r', PEPPERONI[i + 2]);
+        pepperoni.setAttribute('fill', '#DC143C');
+        pepperoni.setAttribute('stroke', '#8B0000');
+        pepperoni.setAttribute('stroke-width', '1');
+        pepperoni.setAttribute('class', 'pepperoni');
+        pizzaSvg.appendChild(pepperoni);
+    }
+}
+
+// Slice lines currently on the pizza, reused between updates
+const sliceLines = [];
+
+// COMPLETELY FIXED: Perfect symmetrical pizza slicing with INSTANT UPDATES!
+function updatePizza() {
+    const numSlices = parseInt(slider.value);
+
+    sliceValue.textContent = numSlices;
+    sliceCount.textContent = `${numSlices} slices`;
+    fractionDisplay.textContent = `1/${numSlices}`;
+
+    const decimalValue = (1/numSlices).toFixed(3);
+    const percentage = ((1/numSlices) * 100).toFixed(1);
+
+    mathExplanation.innerHTML = `
+        <p><strong>🍕 Pizza ÷ ${numSlices} = ${numSlices} equal slices</strong></p>
+        <p>Each slice = <span class="highlight">1/${numSlices}</span> = <span class="highlight">${decimalValue}</span> = <span class="highlight">${percentage}%</span></p>
+        <p><strong>🔢 Algebra:</strong> If pizza = n, then each slice = <span class="highlight">n/${numSlices}</span></p>
+    `;
+
+    // Only add or remove the lines that changed, then move them into place
+    while (sliceLines.length < numSlices) {
+        const line = document.createElementNS('http://www.w3.org/2000/svg', 'line');
+        line.setAttribute('x1', centerX);
+        line.setAttribute('y1', centerY);
+        line.setAttribute('stroke', '#000');
+        line.setAttribute('stroke-width', '4');
+        line.setAttribute('stroke-linecap', 'round');
+        line.setAttribute('class', 'slice-line');
+        pizzaSvg.appendChild(line);
+        sliceLines.push(line);
+    }
+    while (sliceLines.length > numSlices) {
+        sliceLines.pop().remove();
+    }
+
+    // FIX: Calculate EXACT angles with perfect symmetry
+    const exactAngleStep = (2 * Math.PI) / numSlices;
+    sliceLines.forEach((line, i) => {
+        // CRITICAL FIX: Calculate each angle independently from zero
+        const exactAngle = i * exactAngleStep;
+        line.setAttribute('x2', (centerX + radius * Math.cos(exactAngle)).toFixed(2));
+        line.setAttribute('y2', (centerY + radius * Math.sin(exactAngle)).toFixed(2));
+    });
+}
+
+slider.addEventListener('input', function() {
+    const pizzaSvg = document.getElementById('pizzaSvg');
+    pizzaSvg.style.transform = 'rotate(1deg) scale(1.02)';
+    setTimeout(() => {
+        pizzaSvg.style.transform = 'rotate(0deg) scale(1)';
+    }, 100);
+
+    updatePizza();
+});
+
+// Streamlit component protocol: the iframe stays loaded across reruns and
+// only receives the lesson's divisor slider value when it changes.
+function sendToStreamlit(type, data) {
+    window.parent.postMessage(Object.assign({ isStreamlitMessage: true, type: type }, data), '*');
+}
+
+let lessonDivisor = null;
+window.addEventListener('message', function(event) {
+    if (!event.data || event.data.type !== 'streamlit:render') {
+        return;
+    }
+    const divisor = event.data.args.divisor;
+    if (divisor !== lessonDivisor) {
+        lessonDivisor = divisor;
+        slider.value = divisor;
+        updatePizza();
+    }
+    sendToStreamlit('streamlit:setFrameHeight', { height: document.documentElement.scrollHeight });
+});
+
+drawPepperoni();
+updatePizza();
+sendToStreamlit('streamlit:componentReady', { apiVersion: 1 });
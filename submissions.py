@@ -0,0 +1,493 @@
+"""Durable storage for "Submit My Work".
+
+Every student session writes to one shared store, so the teacher dashboard
+sees the whole class and submissions survive restarts. Stores are opened
+from a URL:
+
+    sqlite:///path/to/submissions.db   (default; WAL mode, batched inserts)
+    memory://                          (process-local, for development)
+
+The lesson wraps its store in a WriteBehindStore, so "Submit My Work" only
+queues the submission and a background thread writes queued submissions to
+the store in batches.
+"""
+import abc
+import atexit
+import datetime
+import json
+import sqlite3
+import threading
+import time
+from collections import defaultdict, deque
+from concurrent.futures import Future
+
+from grading import BANK, ScoreAggregate, correctness, grade
+
+DEFAULT_URL = "sqlite:///mathcraft_submissions.db"
+
+# Write-behind: how many submissions may wait to be written, how many go
+# into one transaction, how long add() waits for room in a full queue, and
+# how long a read waits for the queue to be written
+QUEUE_SIZE = 2000
+BATCH_SIZE = 200
+ENQUEUE_TIMEOUT = 5.0
+FLUSH_TIMEOUT = 1.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS submissions (
+    id INTEGER PRIMARY KEY,
+    submitted_at REAL NOT NULL,
+    submitted_on TEXT NOT NULL,
+    class_name TEXT NOT NULL DEFAULT '',
+    name TEXT NOT NULL,
+    score INTEGER,
+    responses TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS submissions_by_class ON submissions (class_name, submitted_on);
+CREATE INDEX IF NOT EXISTS submissions_by_date ON submissions (submitted_on);
+
+-- Running totals per class and day, updated in the same transaction as the
+-- inserts so the dashboard never has to scan submissions.
+CREATE TABLE IF NOT EXISTS question_totals (
+    class_name TEXT NOT NULL,
+    submitted_on TEXT NOT NULL,
+    question INTEGER NOT NULL,
+    correct INTEGER NOT NULL,
+    PRIMARY KEY (class_name, submitted_on, question)
+);
+CREATE TABLE IF NOT EXISTS score_histogram (
+    class_name TEXT NOT NULL,
+    submitted_on TEXT NOT NULL,
+    score INTEGER NOT NULL,
+    students INTEGER NOT NULL,
+    PRIMARY KEY (class_name, submitted_on, score)
+);
+"""
+
+
+def make_submission(responses, class_name="", submitted_at=None):
+    """Build the graded record a store accepts from a session's responses."""
+    submitted_at = time.time() if submitted_at is None else submitted_at
+    correct = correctness(BANK.encode_answers(responses))[0]
+    return {
+        "submitted_at": submitted_at,
+        "submitted_on": datetime.date.fromtimestamp(submitted_at).isoformat(),
+        "class_name": class_name.strip(),
+        "name": responses.get("Name", ""),
+        "score": int(correct.sum()),
+        "correct": correct.tolist(),
+        "responses": dict(responses),
+    }
+
+
+def _row(submission):
+    """Flatten a stored submission into one dashboard/export row, with
+    option indices spelled out as the option text."""
+    submitted = datetime.datetime.fromtimestamp(submission["submitted_at"])
+    responses = submission["responses"]
+    return {
+        "Class": submission["class_name"],
+        "Submitted": submitted.isoformat(sep=" ", timespec="seconds"),
+        "Score": submission["score"],
+        **responses,
+        **{qid: BANK.decode(qid, responses[qid]) for qid in BANK.ids if qid in responses},
+    }
+
+
+class SubmissionBacklog(RuntimeError):
+    """Raised when the write-behind queue stays full for longer than add() waits."""
+
+
+class SubmissionStore(abc.ABC):
+    """Interface every submission backend implements; a backend missing a
+    method fails when it is created, not on the first dashboard render."""
+
+    def add(self, submission):
+        self.add_many([submission])
+
+    @abc.abstractmethod
+    def add_many(self, submissions):
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def query(self, class_name=None, submitted_on=None, limit=None):
+        """Rows for the dashboard, oldest first, optionally filtered.
+
+        With `limit`, only the most recent `limit` matching rows are returned.
+        """
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def iter_chunks(self, class_name=None, submitted_on=None, chunk_size=1000):
+        """Yield every matching row, oldest first, in lists of `chunk_size`."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def iter_since(self, after=0, chunk_size=1000):
+        """Yield (id, submission) pairs for everything stored after id `after`,
+        in lists of `chunk_size`. Ids increase in the order of storage, so
+        the last id seen is a cursor for picking up only new submissions."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def aggregate(self, class_name=None, submitted_on=None):
+        """ScoreAggregate over the matching submissions, without reading them."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def classes(self):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class MemorySubmissionStore(SubmissionStore):
+    """Keeps submissions in this process only; lost on restart."""
+
+    def __init__(self):
+        self._submissions = []
+        self._totals = defaultdict(ScoreAggregate)
+        self._lock = threading.Lock()
+
+    def add_many(self, submissions):
+        with self._lock:
+            self._submissions.extend(submissions)
+            for s in submissions:
+                self._totals[s["class_name"], s["submitted_on"]].add(s["correct"])
+
+    def query(self, class_name=None, submitted_on=None, limit=None):
+        with self._lock:
+            matches = list(self._submissions)
+        rows = [_row(s) for s in matches
+                if (class_name is None or s["class_name"] == class_name)
+                and (submitted_on is None or s["submitted_on"] == submitted_on)]
+        return rows[-limit:] if limit else rows
+
+    def iter_chunks(self, class_name=None, submitted_on=None, chunk_size=1000):
+        rows = self.query(class_name, submitted_on)
+        for start in range(0, len(rows), chunk_size):
+            yield rows[start:start + chunk_size]
+
+    def iter_since(self, after=0, chunk_size=1000):
+        with self._lock:
+            new = list(enumerate(self._submissions[after:], start=after + 1))
+        for start in range(0, len(new), chunk_size):
+            yield new[start:start + chunk_size]
+
+    def aggregate(self, class_name=None, submitted_on=None):
+        total = ScoreAggregate()
+        with self._lock:
+            for (cls, on), totals in self._totals.items():
+                if (class_name is None or cls == class_name) and (submitted_on is None or on == submitted_on):
+                    total.merge(totals)
+        return total
+
+    def classes(self):
+        with self._lock:
+            return sorted({cls for cls, _ in self._totals})
+
+
+class SQLiteSubmissionStore(SubmissionStore):
+    """SQLite in WAL mode, with one connection per thread.
+
+    WAL lets the dashboard read while student sessions write, and each
+    add_many call commits its whole batch in a single transaction.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        conn = self._connection()
+        conn.executescript(SCHEMA)
+        has_totals = conn.execute("SELECT 1 FROM score_histogram LIMIT 1").fetchone()
+        if not has_totals and conn.execute("SELECT 1 FROM submissions LIMIT 1").fetchone():
+            self.rebuild_aggregates()
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def add_many(self, submissions):
+        params = [
+            (s["submitted_at"], s["submitted_on"], s["class_name"], s["name"], s["score"],
+             json.dumps(s["responses"], ensure_ascii=False))
+            for s in submissions
+        ]
+        if not params:
+            return
+        totals = defaultdict(ScoreAggregate)
+        for s in submissions:
+            totals[s["class_name"], s["submitted_on"]].add(s["correct"])
+
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany(
+                "INSERT INTO submissions (submitted_at, submitted_on, class_name, name, score, responses) "
+                "VALUES (?, ?, ?, ?, ?, ?)", params)
+            self._add_totals(conn, totals)
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    @staticmethod
+    def _add_totals(conn, totals):
+        conn.executemany(
+            "INSERT INTO question_totals VALUES (?, ?, ?, ?) ON CONFLICT DO UPDATE "
+            "SET correct = correct + excluded.correct",
+            [(cls, on, question, int(correct))
+             for (cls, on), agg in totals.items()
+             for question, correct in enumerate(agg.correct_counts)])
+        conn.executemany(
+            "INSERT INTO score_histogram VALUES (?, ?, ?, ?) ON CONFLICT DO UPDATE "
+            "SET students = students + excluded.students",
+            [(cls, on, score, int(students))
+             for (cls, on), agg in totals.items()
+             for score, students in enumerate(agg.histogram) if students])
+
+    def rebuild_aggregates(self):
+        """Recompute the running totals from every stored submission."""
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("DELETE FROM question_totals")
+            conn.execute("DELETE FROM score_histogram")
+            rows = conn.execute("SELECT class_name, submitted_on, responses FROM submissions").fetchall()
+            groups = defaultdict(list)
+            for cls, on, responses in rows:
+                responses = json.loads(responses)
+                groups[cls, on].append(BANK.encode_answers(responses))
+            totals = defaultdict(ScoreAggregate)
+            for key, answers in groups.items():
+                totals[key].add(grade(answers).correct)
+            self._add_totals(conn, totals)
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    @staticmethod
+    def _where(class_name, submitted_on):
+        clauses, params = [], []
+        if class_name is not None:
+            clauses.append("class_name = ?")
+            params.append(class_name)
+        if submitted_on is not None:
+            clauses.append("submitted_on = ?")
+            params.append(submitted_on)
+        return (f" WHERE {' AND '.join(clauses)}" if clauses else ""), params
+
+    @staticmethod
+    def _rows(records):
+        return [
+            _row({"submitted_at": at, "submitted_on": on, "class_name": cls, "name": name,
+                  "score": score, "responses": json.loads(responses)})
+            for at, on, cls, name, score, responses in records
+        ]
+
+    def query(self, class_name=None, submitted_on=None, limit=None):
+        where, params = self._where(class_name, submitted_on)
+        sql = ("SELECT submitted_at, submitted_on, class_name, name, score, responses "
+               f"FROM submissions{where} ORDER BY id DESC")
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit)
+        rows = self._rows(self._connection().execute(sql, params))
+        rows.reverse()
+        return rows
+
+    def iter_chunks(self, class_name=None, submitted_on=None, chunk_size=1000):
+        where, params = self._where(class_name, submitted_on)
+        cursor = self._connection().cursor()
+        cursor.execute(
+            "SELECT submitted_at, submitted_on, class_name, name, score, responses "
+            f"FROM submissions{where} ORDER BY id", params)
+        try:
+            while records := cursor.fetchmany(chunk_size):
+                yield self._rows(records)
+        finally:
+            cursor.close()
+
+    def iter_since(self, after=0, chunk_size=1000):
+        cursor = self._connection().cursor()
+        cursor.execute(
+            "SELECT id, submitted_at, submitted_on, class_name, name, score, responses "
+            "FROM submissions WHERE id > ? ORDER BY id", (after,))
+        try:
+            while records := cursor.fetchmany(chunk_size):
+                yield [(id_, {"submitted_at": at, "submitted_on": on, "class_name": cls, "name": name,
+                              "score": score, "responses": json.loads(responses)})
+                       for id_, at, on, cls, name, score, responses in records]
+        finally:
+            cursor.close()
+
+    def aggregate(self, class_name=None, submitted_on=None):
+        where, params = self._where(class_name, submitted_on)
+        conn = self._connection()
+        total = ScoreAggregate()
+        for question, correct in conn.execute(
+                f"SELECT question, SUM(correct) FROM question_totals{where} GROUP BY question", params):
+            total.correct_counts[question] = correct
+        for score, students in conn.execute(
+                f"SELECT score, SUM(students) FROM score_histogram{where} GROUP BY score", params):
+            total.histogram[score] = students
+        total.count = int(total.histogram.sum())
+        return total
+
+    def classes(self):
+        # Every class has a row per question and day in the running totals,
+        # so this reads their primary key index rather than every submission
+        cursor = self._connection().execute(
+            "SELECT DISTINCT class_name FROM question_totals ORDER BY class_name")
+        return [cls for (cls,) in cursor]
+
+    def close(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+class WriteBehindStore(SubmissionStore):
+    """Queues submissions and writes them to `store` from a background thread.
+
+    add() returns a Future at once, so a student's click never waits on the
+    disk; the Future completes (with None) when the submission is stored, or
+    holds the error if it couldn't be. The writer takes everything queued (up
+    to `batch_size`) in one add_many call, so a burst of submissions at the
+    end of a period costs a few transactions instead of one each. The queue
+    is bounded: when it is full, add() blocks for up to `timeout` seconds and
+    then raises SubmissionBacklog. Reads wait up to FLUSH_TIMEOUT for the
+    queue to be written first; close(), which also runs at interpreter exit,
+    writes all of it.
+    """
+
+    def __init__(self, store, queue_size=QUEUE_SIZE, batch_size=BATCH_SIZE, timeout=ENQUEUE_TIMEOUT):
+        self.store = store
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+        self.timeout = timeout
+        self.batches = 0
+        self._pending = deque()
+        self._queued = 0    # submissions accepted so far
+        self._written = 0   # of those, how many the writer has finished with
+        self._closed = False
+        self._condition = threading.Condition()
+        self._writer = threading.Thread(target=self._write_queued, name="submission-writer", daemon=True)
+        self._writer.start()
+        atexit.register(self.close)
+
+    def add(self, submission):
+        return self.add_many([submission])[0]
+
+    def add_many(self, submissions):
+        deadline = time.monotonic() + self.timeout
+        receipts = []
+        with self._condition:
+            for submission in submissions:
+                has_room = self._condition.wait_for(
+                    lambda: self._closed or len(self._pending) < self.queue_size, deadline - time.monotonic())
+                if self._closed:
+                    raise RuntimeError("submission store is closed")
+                if not has_room:
+                    raise SubmissionBacklog(f"{len(self._pending)} submissions are waiting to be saved")
+                receipt = Future()
+                self._pending.append((submission, receipt))
+                self._queued += 1
+                receipts.append(receipt)
+                self._condition.notify_all()
+        return receipts
+
+    def pending(self):
+        return len(self._pending)
+
+    def flush(self, timeout=None):
+        """Wait until everything queued so far has been written; False if
+        `timeout` seconds ran out first."""
+        with self._condition:
+            queued = self._queued
+            return self._condition.wait_for(lambda: self._written >= queued, timeout)
+
+    def _write_queued(self):
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._pending or self._closed)
+                if not self._pending:
+                    break
+                batch = [self._pending.popleft() for _ in range(min(self.batch_size, len(self._pending)))]
+                self._condition.notify_all()
+            error = None
+            try:
+                self.store.add_many([submission for submission, _ in batch])
+                self.batches += 1
+            except Exception as exc:
+                error = exc
+            for _, receipt in batch:
+                if error is not None:
+                    receipt.set_exception(error)
+                else:
+                    # Not the submission: sessions keep the receipt, and it would keep the essays alive
+                    receipt.set_result(None)
+            with self._condition:
+                self._written += len(batch)
+                self._condition.notify_all()
+        # SQLite connections are per thread, so the writer closes its own
+        self.store.close()
+
+    # Reads give the queue a moment to be written first, so the dashboard
+    # sees what was just submitted without stalling behind a whole burst
+
+    def query(self, class_name=None, submitted_on=None, limit=None):
+        self.flush(FLUSH_TIMEOUT)
+        return self.store.query(class_name, submitted_on, limit)
+
+    def iter_chunks(self, class_name=None, submitted_on=None, chunk_size=1000):
+        self.flush(FLUSH_TIMEOUT)
+        return self.store.iter_chunks(class_name, submitted_on, chunk_size)
+
+    def iter_since(self, after=0, chunk_size=1000):
+        self.flush(FLUSH_TIMEOUT)
+        return self.store.iter_since(after, chunk_size)
+
+    def aggregate(self, class_name=None, submitted_on=None):
+        self.flush(FLUSH_TIMEOUT)
+        return self.store.aggregate(class_name, submitted_on)
+
+    def classes(self):
+        self.flush(FLUSH_TIMEOUT)
+        return self.store.classes()
+
+    def close(self):
+        """Write everything queued, then stop the writer; later adds raise."""
+        with self._condition:
+            if self._closed:
+                return
+            self._closed = True
+            self._condition.notify_all()
+        self._writer.join()
+        self.store.close()
+        atexit.unregister(self.close)
+
+
+BACKENDS = {
+    "sqlite": lambda location: SQLiteSubmissionStore(location),
+    "memory": lambda location: MemorySubmissionStore(),
+}
+
+
+def open_store(url=DEFAULT_URL):
+    """Open the submission store described by `url`."""
+    scheme, sep, location = url.partition("://")
+    if not sep or scheme not in BACKENDS:
+        raise ValueError(f"unsupported submission store URL: {url!r}")
+    if scheme == "sqlite":
+        # sqlite:///relative.db and sqlite:////absolute/path.db
+        location = location[1:] if location.startswith("/") else location
+    return BACKENDS[scheme](location)
@@ -0,0 +1,137 @@
+"""SVG versions of the grouping diagrams (fig1 and fig2).
+
+These diagrams are only rectangles, circles and text, so they are written
+out as SVG markup directly instead of going through a matplotlib Figure and
+Agg rasterization. The layouts mirror the builders in figures.py.
+"""
+import functools
+from xml.sax.saxutils import escape
+
+from notation import compile_expression, mixed_number
+
+FONT = "font-family='DejaVu Sans, Arial, sans-serif'"
+
+
+class _Panel:
+    """Maps data coordinates inside a rectangle of the canvas to pixels."""
+
+    def __init__(self, left, top, width, height, xlim=(0, 1), ylim=(0, 1)):
+        self.left, self.top, self.width, self.height = left, top, width, height
+        self.xlim, self.ylim = xlim, ylim
+
+    def x(self, value):
+        x0, x1 = self.xlim
+        return self.left + (value - x0) / (x1 - x0) * self.width
+
+    def y(self, value):
+        y0, y1 = self.ylim
+        return self.top + (1 - (value - y0) / (y1 - y0)) * self.height
+
+    def scale(self, value):
+        x0, x1 = self.xlim
+        return value / (x1 - x0) * self.width
+
+
+def _text(x, y, content, size, color="black", bold=False, anchor="middle"):
+    weight = " font-weight='bold'" if bold else ""
+    return (f"<text x='{x:.1f}' y='{y:.1f}' font-size='{size}' fill='{color}' "
+            f"text-anchor='{anchor}' dominant-baseline='central'{weight}>{escape(content)}</text>")
+
+
+def _box(cx, cy, width, height, fill, stroke="black"):
+    return (f"<rect x='{cx - width / 2:.1f}' y='{cy - height / 2:.1f}' width='{width:.1f}' "
+            f"height='{height:.1f}' rx='8' fill='{fill}' stroke='{stroke}'/>")
+
+
+def _svg(width, height, parts):
+    return (f"<svg xmlns='http://www.w3.org/2000/svg' viewBox='0 0 {width} {height}' "
+            f"width='100%' {FONT}><rect width='{width}' height='{height}' fill='white'/>"
+            + "".join(parts) + "</svg>")
+
+
+@functools.lru_cache(maxsize=32)
+def groups_of_x_svg(multiplier):
+    """fig1 as SVG: `multiplier` groups of x, the translation, and the pattern."""
+    x_value = 4
+    parts = []
+
+    # Visual 1: 3x means 3 groups of x
+    panel = _Panel(10, 80, 480, 400, xlim=(-0.5, max(multiplier * 1.5, 1.5)),
+                   ylim=(-0.5, x_value * 0.3 + 0.5))
+    parts.append(_text(250, 22, f"{multiplier}x means {multiplier} groups of x", 17, bold=True))
+    parts.append(_text(250, 46, f"(if x = {x_value}, then {multiplier}x = {multiplier} · {x_value} = {multiplier * x_value})",
+                       17, bold=True))
+    radius = min(16, panel.scale(0.6))
+    for group in range(multiplier):
+        for item in range(x_value):
+            cx, cy = panel.x(group * 1.5), panel.y(item * 0.3)
+            parts.append(f"<circle cx='{cx:.1f}' cy='{cy:.1f}' r='{radius:.1f}' fill='lightblue' stroke='black'/>")
+            parts.append(_text(cx, cy, "x", round(radius * 1.4)))
+
+    # Visual 2: Show the translation
+    parts.append(_text(750, 22, "Algebra Notation ↔ Regular Math", 17, bold=True))
+    parts.append(_text(750, 170, f"{multiplier}x", 48, color="blue", bold=True))
+    parts.append(_text(750, 270, "=", 32))
+    parts.append(_text(750, 370, f"{multiplier} · x", 32, color="red"))
+
+    # Visual 3: Multiple examples
+    parts.append(_text(1250, 22, "Pattern Recognition", 17, bold=True))
+    for i, letter in enumerate("xyn"):
+        cy = 130 + i * 90
+        parts.append(_box(1250, cy, 260, 50, "lightyellow"))
+        parts.append(_text(1250, cy, f"{multiplier}{letter} = {multiplier} · {letter}", 21))
+
+    return _svg(1500, 500, parts)
+
+
+@functools.lru_cache(maxsize=32)
+def division_groups_svg(divisor):
+    """fig2 as SVG: 24 items shared into `divisor` colored groups."""
+    n_value = 24
+    share = compile_expression(f"n/{divisor}")(n=n_value)
+    items_per_group = int(share)
+    colors = ['#FF6B6B', '#4ECDC4', '#45B7D1', '#96CEB4', '#FECA57', '#FF9FF3', '#54A0FF', '#5F27CD']
+    panel = _Panel(0, 0, 1400, 800)
+    parts = [
+        _text(700, panel.y(0.95) + 18, f"n/{divisor} means n ÷ {divisor}", 32, color="blue", bold=True),
+        _text(700, panel.y(0.88) + 14, f"If n = {n_value}, then n/{divisor} = {n_value} ÷ {divisor} = {mixed_number(share)}",
+              24, color="red"),
+    ]
+
+    group_width = 0.8 / divisor
+    item_size = min(group_width * 0.8, 0.08)
+    items_per_row = 3
+    for group in range(divisor):
+        group_x = 0.1 + group * group_width
+        color = colors[group % len(colors)]
+        center = panel.x(group_x + group_width * 0.45)
+
+        parts.append(f"<rect x='{panel.x(group_x):.1f}' y='{panel.y(0.7):.1f}' "
+                     f"width='{panel.scale(group_width * 0.9):.1f}' height='{panel.height * 0.4:.1f}' "
+                     f"fill='{color}' fill-opacity='0.2' stroke='{color}' stroke-width='2'/>")
+        parts.append(_text(center, panel.y(0.75), f"Group {group + 1}", 16, color=color, bold=True))
+
+        for item in range(items_per_group):
+            row, col = divmod(item, items_per_row)
+            item_x = group_x + (col + 0.5) * (group_width * 0.9 / items_per_row)
+            item_y = 0.35 + row * 0.08
+            parts.append(f"<circle cx='{panel.x(item_x):.1f}' cy='{panel.y(item_y):.1f}' "
+                         f"r='{panel.scale(item_size / 2):.1f}' fill='{color}' stroke='black'/>")
+
+        parts.append(_text(center, panel.y(0.2), f"{mixed_number(share)} items", 15, bold=True))
+
+    parts.append(_box(700, panel.y(0.1), 760, 56, "lightyellow", stroke="orange"))
+    parts.append(_text(700, panel.y(0.1), f"{n_value} items ÷ {divisor} groups = {mixed_number(share)} items per group", 22))
+
+    return _svg(1400, 800, parts)
+
+
+SVG_BUILDERS = {
+    "fig1": groups_of_x_svg,
+    "fig2": division_groups_svg,
+}
+
+
+def render_svg(figure_id, *params):
+    """Return the cached SVG markup for `figure_id` built from `params`."""
+    return SVG_BUILDERS[figure_id](*params)
@@ -0,0 +1,342 @@
+"""Printable PDF worksheets of the lesson for a whole class roster.
+
+    python worksheets.py ROSTER OUT_DIR [--randomize] [--seed N] [--combined] [--processes N]
+
+ROSTER is a CSV with a "Name" (and optionally "Class") column, or a plain
+text file with one name per line. Each student gets a worksheet with the
+Section 1-3 visuals, twelve practice questions and the analytical questions,
+and OUT_DIR also gets an answer key for the whole roster. With --randomize
+every student gets their own slider values and generated questions in place
+of Q1-Q12.
+
+Every distinct figure is drawn once, in a process pool, and then embedded in
+as many worksheets as need it; the PDFs themselves are assembled directly
+(text in the built-in Helvetica, figures as indexed-color images), so a
+class of 500 takes seconds.
+"""
+import argparse
+import csv
+import io
+import os
+import re
+import sys
+import textwrap
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from typing import NamedTuple
+
+import numpy as np
+
+import figures
+from grading import BANK
+from item_generator import generate_items
+
+# US Letter in points, with half-inch margins
+PAGE_WIDTH, PAGE_HEIGHT = 612, 792
+MARGIN = 36
+CONTENT_WIDTH = PAGE_WIDTH - 2 * MARGIN
+# Figures span the content width at 200 dpi
+PRINT_WIDTH = round(CONTENT_WIDTH / 72 * 200)
+
+# The slider values the lesson opens with
+DEFAULT_PARAMS = {"fig1": (3,), "fig2": (8,), "fig4": (3, 4)}
+
+SECTIONS = [
+    ("Section 1: Multiplication Without the · Symbol",
+     "The Big Idea: In algebra, we often skip writing the multiplication symbol!",
+     "fig1", "multiplication", "kx"),
+    ("Section 2: Division Using Fraction Notation",
+     "The Big Idea: n/8 means n divided by 8, just like a fraction!",
+     "fig2", "division", "n/d"),
+    ("Section 3: Combining Operations",
+     "The Big Idea: We can combine multiplication and division in algebra notation!",
+     "fig4", "challenge", "kx/d"),
+]
+LETTERS = "ABCD"
+
+
+class Student(NamedTuple):
+    name: str
+    class_name: str
+    params: dict     # figure_id -> params
+    questions: list  # twelve Questions, in section order
+
+
+def load_roster(path):
+    """[(name, class_name)] from a CSV with a Name column or one name per line."""
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        rows = [row for row in csv.reader(f) if any(cell.strip() for cell in row)]
+    header = [cell.strip().lower() for cell in rows[0]] if rows else []
+    if "name" not in header:
+        return [(row[0].strip(), "") for row in rows]
+    name_col = header.index("name")
+    class_col = header.index("class") if "class" in header else None
+    roster = []
+    for row in rows[1:]:
+        # Spreadsheets drop trailing empty cells, so a row can be shorter than the header
+        name = row[name_col].strip() if len(row) > name_col else ""
+        if name:
+            roster.append((name, row[class_col].strip() if class_col is not None and len(row) > class_col else ""))
+    return roster
+
+
+def plan_worksheets(roster, randomize=False, seed=0):
+    """The Student for every roster entry; randomized in whole-roster batches."""
+    count = len(roster)
+    if not randomize:
+        return [Student(name, class_name, DEFAULT_PARAMS, list(BANK.questions)) for name, class_name in roster]
+
+    rng = np.random.default_rng(seed)
+    params = {figure_id: [domain[i] for i in rng.integers(len(domain), size=count)]
+              for figure_id, domain in ((f, list(d)) for f, d in figures.FIGURE_DOMAINS.items())}
+    items = {form: generate_items(4 * count, seed=seed + n, forms=(form,))
+             for n, (*_, form) in enumerate(SECTIONS)}
+    students = []
+    for i, (name, class_name) in enumerate(roster):
+        questions = []
+        for *_, group, form in SECTIONS:
+            batch = items[form]
+            questions += [batch.question(j, f"Q{len(questions) + 1}", group) for j in range(4 * i, 4 * i + 4)]
+        students.append(Student(name, class_name, {f: params[f][i] for f in params}, questions))
+    return students
+
+
+def render_figure(key):
+    """A figure as (width, height, RGB palette, compressed color indices)."""
+    from PIL import Image
+
+    figure_id, params = key
+    png8 = figures.encode_figure(figures.FIGURE_BUILDERS[figure_id](*params), "png8", PRINT_WIDTH)
+    image = Image.open(io.BytesIO(png8))
+    colors = max(index for _, index in image.getcolors()) + 1
+    palette = bytes(image.getpalette()[:3 * colors])
+    return image.width, image.height, palette, zlib.compress(image.tobytes(), 6)
+
+
+class PDF:
+    """Just enough of a PDF writer for text, rules and shared images."""
+
+    def __init__(self):
+        self.objects = []  # bytes per object, numbered from 1
+        self.pages = []
+        self.images = {}   # figure key -> (resource name, object number)
+        self.catalog = self._reserve()
+        self.page_tree = self._reserve()
+        self.fonts = {
+            "F1": self._add(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>"),
+            "F2": self._add(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold /Encoding /WinAnsiEncoding >>"),
+        }
+
+    def _reserve(self):
+        self.objects.append(None)
+        return len(self.objects)
+
+    def _add(self, data):
+        self.objects.append(data)
+        return len(self.objects)
+
+    def _stream(self, dictionary, data):
+        return self._add(b"<< %s /Length %d >>\nstream\n%s\nendstream" % (dictionary, len(data), data))
+
+    def image(self, key, rendered):
+        if key not in self.images:
+            width, height, palette, indices = rendered
+            dictionary = (b"/Type /XObject /Subtype /Image /Width %d /Height %d /BitsPerComponent 8 "
+                          b"/ColorSpace [/Indexed /DeviceRGB %d <%s>] /Filter /FlateDecode"
+                          % (width, height, len(palette) // 3 - 1, palette.hex().encode()))
+            self.images[key] = (f"Im{len(self.images)}", self._stream(dictionary, indices))
+        return self.images[key][0]
+
+    def add_page(self, content, image_names):
+        images = " ".join(f"/{name} {number} 0 R" for name, number in self.images.values() if name in image_names)
+        fonts = " ".join(f"/{name} {number} 0 R" for name, number in self.fonts.items())
+        contents = self._stream(b"/Filter /FlateDecode", zlib.compress(content.encode("latin-1")))
+        self.pages.append(self._add(
+            f"<< /Type /Page /Parent {self.page_tree} 0 R /MediaBox [0 0 {PAGE_WIDTH} {PAGE_HEIGHT}] "
+            f"/Resources << /Font << {fonts} >> /XObject << {images} >> >> /Contents {contents} 0 R >>".encode()))
+
+    def write(self, path):
+        self.objects[self.catalog - 1] = b"<< /Type /Catalog /Pages %d 0 R >>" % self.page_tree
+        kids = " ".join(f"{page} 0 R" for page in self.pages)
+        self.objects[self.page_tree - 1] = f"<< /Type /Pages /Kids [{kids}] /Count {len(self.pages)} >>".encode()
+        out = io.BytesIO()
+        out.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        offsets = []
+        for number, data in enumerate(self.objects, 1):
+            offsets.append(out.tell())
+            out.write(b"%d 0 obj\n%s\nendobj\n" % (number, data))
+        xref = out.tell()
+        out.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(self.objects) + 1))
+        out.write(b"".join(b"%010d 00000 n \n" % offset for offset in offsets))
+        out.write(b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n"
+                  % (len(self.objects) + 1, self.catalog, xref))
+        with open(path, "wb") as f:
+            f.write(out.getvalue())
+
+
+def _pdf_text(text):
+    # The built-in fonts use WinAnsi (cp1252), which has · ÷ and ×
+    text = text.encode("cp1252", errors="replace").decode("latin-1")
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+class Layout:
+    """Flows text, writing lines and figures down the pages of a PDF."""
+
+    def __init__(self, pdf, images):
+        self.pdf = pdf
+        self.images = images
+        self.ops = []
+        self.used = set()
+        self.y = PAGE_HEIGHT - MARGIN
+
+    def page_break(self):
+        if self.ops:
+            self.pdf.add_page("\n".join(self.ops), self.used)
+        self.ops, self.used = [], set()
+        self.y = PAGE_HEIGHT - MARGIN
+
+    def ensure(self, height):
+        if self.y - height < MARGIN:
+            self.page_break()
+
+    def text(self, text, size=11, bold=False, indent=0, space_after=4):
+        # Helvetica averages about half an em per character
+        width = int((CONTENT_WIDTH - indent) / (size * 0.5))
+        for line in textwrap.wrap(text, width) or [""]:
+            self.ensure(size * 1.3)
+            self.y -= size * 1.3
+            font = "F2" if bold else "F1"
+            self.ops.append(f"BT /{font} {size} Tf {MARGIN + indent} {self.y:.1f} Td ({_pdf_text(line)}) Tj ET")
+        self.y -= space_after
+
+    def writing_lines(self, count, gap=20):
+        self.ensure(count * gap)
+        for _ in range(count):
+            self.y -= gap
+            self.ops.append(f"0.6 G 0.5 w {MARGIN} {self.y:.1f} m {PAGE_WIDTH - MARGIN} {self.y:.1f} l S 0 G")
+        self.y -= 6
+
+    def figure_height(self, key):
+        width, height = self.images[key][:2]
+        return CONTENT_WIDTH * height / width
+
+    def figure(self, key):
+        draw_height = self.figure_height(key)
+        self.ensure(draw_height + 6)
+        self.y -= draw_height + 6
+        name = self.pdf.image(key, self.images[key])
+        self.used.add(name)
+        self.ops.append(f"q {CONTENT_WIDTH} 0 0 {draw_height:.1f} {MARGIN} {self.y:.1f} cm /{name} Do Q")
+
+
+def add_worksheet(pdf, student, images):
+    layout = Layout(pdf, images)
+    layout.text("MathCraft | Understanding Algebra Notation", size=16, bold=True)
+    layout.text(f"Name: {student.name or '____________________'}      "
+                f"Class/Period: {student.class_name or '__________'}      Date: ______________", space_after=10)
+    questions = iter(enumerate(student.questions, 1))
+    for title, idea, figure_id, _, _ in SECTIONS:
+        # Keep the heading on the same page as its figure
+        layout.ensure(50 + layout.figure_height((figure_id, student.params[figure_id])))
+        layout.text(title, size=13, bold=True)
+        layout.text(idea, size=10)
+        layout.figure((figure_id, student.params[figure_id]))
+        layout.text("Practice: circle the right answer", size=11, bold=True)
+        for _ in range(4):
+            number, question = next(questions)
+            layout.ensure(40)
+            layout.text(f"{number}. {question.prompt}", indent=6, space_after=1)
+            layout.text("      ".join(f"{letter}) {option}" for letter, option in zip(LETTERS, question.options)),
+                        size=10, indent=24, space_after=6)
+    layout.page_break()
+    layout.text("Analytical Thinking: Why Does This Work?", size=13, bold=True)
+    for question in BANK.analytical:
+        layout.ensure(120)
+        layout.text(question.prompt.replace("**", ""), space_after=0)
+        layout.writing_lines(4)
+    layout.page_break()
+
+
+def add_answer_key(pdf, students):
+    layout = Layout(pdf, {})
+    layout.text("Answer Key | Understanding Algebra Notation", size=16, bold=True)
+    for student in students:
+        answers = "  ".join(f"{n}{LETTERS[q.answer]}" for n, q in enumerate(student.questions, 1))
+        layout.text(f"{student.name} {f'({student.class_name})' if student.class_name else ''}", bold=True, space_after=0)
+        layout.text(answers, size=10, indent=12, space_after=6)
+    layout.page_break()
+
+
+def file_name(number, student):
+    slug = re.sub(r"[^A-Za-z0-9]+", "-", student.name).strip("-").lower() or "student"
+    return f"{number:03d}-{slug}.pdf"
+
+
+_images = {}
+
+
+def _install_images(images):
+    _images.update(images)
+
+
+def _write_worksheets(batch):
+    for path, student in batch:
+        pdf = PDF()
+        add_worksheet(pdf, student, _images)
+        pdf.write(path)
+    return len(batch)
+
+
+def generate(roster, out_dir, randomize=False, seed=0, combined=False, processes=None):
+    """Write the class's worksheets and answer key into `out_dir`; return the paths."""
+    os.makedirs(out_dir, exist_ok=True)
+    students = plan_worksheets(roster, randomize, seed)
+    keys = sorted({(figure_id, params) for student in students for figure_id, params in student.params.items()})
+
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        images = dict(zip(keys, pool.map(render_figure, keys)))
+
+    paths = []
+    if combined:
+        pdf = PDF()
+        for student in students:
+            add_worksheet(pdf, student, images)
+        paths.append(os.path.join(out_dir, "worksheets.pdf"))
+        pdf.write(paths[-1])
+    else:
+        jobs = [(os.path.join(out_dir, file_name(n, s)), s) for n, s in enumerate(students, 1)]
+        paths += [path for path, _ in jobs]
+        # Each worker gets the rendered figures once, then writes PDFs in batches
+        batch_size = max(1, len(jobs) // (4 * (processes or os.cpu_count() or 1)))
+        with ProcessPoolExecutor(max_workers=processes, initializer=_install_images, initargs=(images,)) as pool:
+            list(pool.map(_write_worksheets, [jobs[i:i + batch_size] for i in range(0, len(jobs), batch_size)]))
+
+    pdf = PDF()
+    add_answer_key(pdf, students)
+    paths.append(os.path.join(out_dir, "answer_key.pdf"))
+    pdf.write(paths[-1])
+    return paths
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("roster")
+    parser.add_argument("out_dir")
+    parser.add_argument("--randomize", action="store_true", help="per-student slider values and questions")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--combined", action="store_true", help="one PDF for the whole class")
+    parser.add_argument("--processes", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    roster = load_roster(args.roster)
+    if not roster:
+        print(f"No students in {args.roster}", file=sys.stderr)
+        return 1
+    paths = generate(roster, args.out_dir, args.randomize, args.seed, args.combined, args.processes)
+    print(f"Wrote {len(paths)} files for {len(roster)} students to {args.out_dir}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())